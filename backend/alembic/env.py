@@ -11,7 +11,7 @@ from alembic import context
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import Base
-from app.models import User, Reel  # noqa: F401
+from app.models import User, Reel, Job, ScriptCache, StoredObject  # noqa: F401
 from config import get_settings
 
 settings = get_settings()
@@ -0,0 +1,46 @@
+"""Add script cache
+
+Revision ID: 1d6b4e8f2a57
+Revises: e7a93b5f0c18
+Create Date: 2026-10-18 13:05:29.481337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d6b4e8f2a57'
+down_revision: Union[str, None] = 'e7a93b5f0c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('script_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(), nullable=False),
+    sa.Column('normalized_topic', sa.String(), nullable=False),
+    sa.Column('language', sa.String(), nullable=False),
+    sa.Column('prompt_version', sa.String(), nullable=False),
+    sa.Column('variant', sa.Integer(), nullable=True),
+    sa.Column('script_text', sa.Text(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key', 'variant')
+    )
+    with op.batch_alter_table('script_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_script_cache_cache_key'), ['cache_key'], unique=False)
+        batch_op.create_index(batch_op.f('ix_script_cache_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('script_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_script_cache_id'))
+        batch_op.drop_index(batch_op.f('ix_script_cache_cache_key'))
+
+    op.drop_table('script_cache')
@@ -0,0 +1,28 @@
+"""Add reels (user_id, created_at) index
+
+Revision ID: 4c8e1a7b3d90
+Revises: 1d6b4e8f2a57
+Create Date: 2026-10-18 15:02:17.448913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e1a7b3d90'
+down_revision: Union[str, None] = '1d6b4e8f2a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.create_index('ix_reels_user_id_created_at', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.drop_index('ix_reels_user_id_created_at')
@@ -0,0 +1,32 @@
+"""Add reel stage fingerprints
+
+Revision ID: 5b8e0d4c2a61
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 10:02:17.553104
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e0d4c2a61'
+down_revision: Union[str, None] = '3f1c2a9b7d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('audio_fingerprint', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('video_raw_fingerprint', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('video_final_fingerprint', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.drop_column('video_final_fingerprint')
+        batch_op.drop_column('video_raw_fingerprint')
+        batch_op.drop_column('audio_fingerprint')
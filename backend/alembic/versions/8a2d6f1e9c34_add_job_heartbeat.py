@@ -0,0 +1,28 @@
+"""Add job heartbeat
+
+Revision ID: 8a2d6f1e9c34
+Revises: 5b8e0d4c2a61
+Create Date: 2026-10-18 10:41:55.017622
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a2d6f1e9c34'
+down_revision: Union[str, None] = '5b8e0d4c2a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
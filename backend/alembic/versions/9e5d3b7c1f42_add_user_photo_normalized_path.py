@@ -0,0 +1,28 @@
+"""Add user photo_normalized_path
+
+Revision ID: 9e5d3b7c1f42
+Revises: 4c8e1a7b3d90
+Create Date: 2026-10-18 16:41:09.237815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5d3b7c1f42'
+down_revision: Union[str, None] = '4c8e1a7b3d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('photo_normalized_path', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('photo_normalized_path')
@@ -0,0 +1,42 @@
+"""Add stored objects
+
+Revision ID: b3f7e2a9c615
+Revises: 9e5d3b7c1f42
+Create Date: 2026-10-18 17:20:44.561208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7e2a9c615'
+down_revision: Union[str, None] = '9e5d3b7c1f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_objects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rel_path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('rel_path')
+    )
+    with op.batch_alter_table('stored_objects', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stored_objects_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stored_objects_sha256'), ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('stored_objects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stored_objects_sha256'))
+        batch_op.drop_index(batch_op.f('ix_stored_objects_id'))
+
+    op.drop_table('stored_objects')
@@ -0,0 +1,28 @@
+"""Add reel encode profile
+
+Revision ID: c41f7a0e5d92
+Revises: 8a2d6f1e9c34
+Create Date: 2026-10-18 11:20:08.734190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a0e5d92'
+down_revision: Union[str, None] = '8a2d6f1e9c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('encode_profile', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.drop_column('encode_profile')
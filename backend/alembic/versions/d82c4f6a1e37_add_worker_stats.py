@@ -0,0 +1,40 @@
+"""Add worker stats
+
+Revision ID: d82c4f6a1e37
+Revises: b3f7e2a9c615
+Create Date: 2026-10-18 21:05:12.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd82c4f6a1e37'
+down_revision: Union[str, None] = 'b3f7e2a9c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('worker_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.String(), nullable=False),
+    sa.Column('stats', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('worker_id')
+    )
+    with op.batch_alter_table('worker_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_worker_stats_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_worker_stats_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('worker_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_worker_stats_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_worker_stats_id'))
+
+    op.drop_table('worker_stats')
@@ -0,0 +1,30 @@
+"""Add reel progress
+
+Revision ID: e7a93b5f0c18
+Revises: c41f7a0e5d92
+Create Date: 2026-10-18 11:58:43.120576
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a93b5f0c18'
+down_revision: Union[str, None] = 'c41f7a0e5d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress_percent', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('eta_seconds', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reels', schema=None) as batch_op:
+        batch_op.drop_column('eta_seconds')
+        batch_op.drop_column('progress_percent')
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from config import get_settings
@@ -15,10 +16,50 @@ if db_url.startswith("postgresql") and "sslmode" not in db_url:
     separator = "&" if "?" in db_url else "?"
     db_url = f"{db_url}{separator}sslmode=require"
 
-engine = create_engine(db_url, connect_args=connect_args)
+engine_kwargs = {}
+if ":memory:" not in db_url:
+    # Pipeline stages only check out connections for short status writes, so a
+    # small pool serves many concurrent renders plus the web requests
+    engine_kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+engine = create_engine(db_url, connect_args=connect_args, **engine_kwargs)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_engine_args(url: str):
+    """Async driver URL (asyncpg / aiosqlite) plus its connect and pool arguments."""
+    url = make_url(url)
+    kwargs = {}
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    else:
+        # asyncpg takes ssl as a connect argument rather than ?sslmode=
+        query = dict(url.query)
+        sslmode = query.pop("sslmode", "require")
+        url = url.set(drivername="postgresql+asyncpg", query=query)
+        if sslmode != "disable":
+            kwargs["connect_args"] = {"ssl": sslmode}
+        kwargs.update(engine_kwargs)
+    return url, kwargs
+
+
+# Async stack for the API routers, only built when enabled so the async
+# drivers stay optional for the sync deployment and the worker
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url, async_kwargs = _async_engine_args(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **async_kwargs)
+    # Objects stay readable after commit without an implicit (sync) refresh
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -29,3 +70,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,19 +1,77 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import SessionLocal, AsyncSessionLocal
 from app.models import User
 from app.services.auth_service import decode_token
+from app.services.user_cache import get_cached_user, cache_user
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ) -> User:
-    token = credentials.credentials
+    """
+    Resolve the bearer token to a user. Users are served from a short-lived
+    in-process cache, so a DB session is only opened on a miss. The returned
+    object is a shared, detached snapshot: don't modify it.
+    """
+    return _user_from_token(credentials.credentials)
+
+
+def get_stream_user(
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> User:
+    """
+    Auth for long-lived streams. Browsers' EventSource cannot send headers,
+    so the access token may also come as ?token=.
+    """
+    if credentials:
+        token = credentials.credentials
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+
+    return _user_from_token(token)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> User:
+    """get_current_user for the async routers; cache misses load through AsyncSession."""
+    user_id = _user_id_from_token(credentials.credentials)
+    user = get_cached_user(user_id)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                )
+            db.expunge(user)
+        cache_user(user)
+    return user
+
+
+def _user_from_token(token: str) -> User:
+    user_id = _user_id_from_token(token)
+    user = get_cached_user(user_id)
+    if user is None:
+        user = _load_user(user_id)
+        cache_user(user)
+
+    return user
+
+
+def _user_id_from_token(token: str) -> int:
     payload = decode_token(token)
 
     if payload is None:
@@ -35,11 +93,19 @@ def get_current_user(
             detail="Invalid token payload",
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    return int(user_id)
 
-    return user
+
+def _load_user(user_id: int) -> User:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
@@ -0,0 +1,48 @@
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+# Multipart framing and other form fields around the file
+FRAMING_SLACK_BYTES = 1024 * 1024
+
+
+class UploadLimitMiddleware:
+    """
+    Caps request bodies on upload endpoints before the multipart parser
+    reads them. A declared Content-Length over the cap is refused without
+    reading anything; otherwise bytes are counted as they arrive and the
+    request is aborted with 413 as soon as the cap is crossed, so an
+    oversized upload is never spooled to disk in full.
+    """
+
+    def __init__(self, app, limits_mb: dict):
+        self.app = app
+        self.limits = {path: mb * 1024 * 1024 + FRAMING_SLACK_BYTES for path, mb in limits_mb.items()}
+        self.limits_mb = limits_mb
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"File too large (max {self.limits_mb[scope['path']]}MB)"
+        declared = Headers(scope=scope).get("content-length")
+        if declared and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI re-raises HTTPExceptions from body parsing as-is
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
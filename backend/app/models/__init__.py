@@ -1,3 +1,3 @@
-from app.models.models import User, Reel
+from app.models.models import User, Reel, Job, ScriptCache, StoredObject, WorkerStats
 
-__all__ = ["User", "Reel"]
+__all__ = ["User", "Reel", "Job", "ScriptCache", "StoredObject", "WorkerStats"]
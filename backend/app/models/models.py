@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Float, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 
@@ -14,6 +14,7 @@ class User(Base):
     full_name = Column(String, nullable=False)
     specialization = Column(String, nullable=True)
     photo_path = Column(String, nullable=True)
+    photo_normalized_path = Column(String, nullable=True)  # cropped/downscaled lip-sync input
     voice_sample_path = Column(String, nullable=True)
     is_onboarded = Column(Boolean, default=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -24,21 +25,86 @@ class User(Base):
 
 class Reel(Base):
     __tablename__ = "reels"
+    # Serves the per-user, newest-first listing (keyset pagination)
+    __table_args__ = (Index("ix_reels_user_id_created_at", "user_id", "created_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     topic = Column(String, nullable=False)
     language = Column(String, default="en")  # "en" or "hi"
     status = Column(String, default="pending")
+    encode_profile = Column(String, nullable=True)  # "draft", "standard", "archive"; None = config default
     # Status flow: pending → generating_script → script_ready → generating_audio
     #              → generating_video → post_processing → completed | failed
     script_text = Column(Text, nullable=True)
     audio_path = Column(String, nullable=True)
     video_raw_path = Column(String, nullable=True)
     video_final_path = Column(String, nullable=True)
+    # Fingerprints of the inputs each stage artifact was produced from
+    audio_fingerprint = Column(String, nullable=True)
+    video_raw_fingerprint = Column(String, nullable=True)
+    video_final_fingerprint = Column(String, nullable=True)
     error_message = Column(Text, nullable=True)
     duration_seconds = Column(Float, nullable=True)
+    progress_percent = Column(Float, nullable=True)  # live encode progress during post_processing
+    eta_seconds = Column(Float, nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     completed_at = Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="reels")
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # "script" or "pipeline"
+    reel_id = Column(Integer, ForeignKey("reels.id", ondelete="CASCADE"), nullable=True, index=True)
+    payload = Column(Text, nullable=True)  # JSON-encoded extra arguments
+    status = Column(String, default="queued", index=True)
+    # Status flow: queued → running → done | failed
+    attempts = Column(Integer, default=0)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # lease expires when this goes stale
+    error_message = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ScriptCache(Base):
+    __tablename__ = "script_cache"
+    __table_args__ = (UniqueConstraint("cache_key", "variant"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, nullable=False, index=True)  # hash of normalized topic + language + prompt version
+    normalized_topic = Column(String, nullable=False)
+    language = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    variant = Column(Integer, default=0)
+    script_text = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_used_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class WorkerStats(Base):
+    """Latest stats snapshot from a worker process, refreshed on every heartbeat."""
+    __tablename__ = "worker_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    worker_id = Column(String, nullable=False, unique=True)
+    stats = Column(Text, nullable=False)  # JSON-encoded snapshot
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+
+class StoredObject(Base):
+    """Reference count for a file in the content-addressed storage layout."""
+    __tablename__ = "stored_objects"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rel_path = Column(String, nullable=False, unique=True)  # objects/<sha[:2]>/<sha[2:4]>/<sha><ext>
+    sha256 = Column(String, nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
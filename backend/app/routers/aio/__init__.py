@@ -0,0 +1,6 @@
+"""
+Async variants of the auth, users and reels routers, backed by AsyncSession.
+main.py mounts these instead of the sync routers when DB_ASYNC is set;
+the asyncpg / aiosqlite drivers come from requirements-async.txt.
+Validation and state changes are shared with the sync routers.
+"""
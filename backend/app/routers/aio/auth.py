@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models import User
+from app.routers.auth import (
+    _new_user, _refresh_user_id, _tokens, _email_taken, _invalid_credentials, _user_not_found,
+)
+from app.schemas import UserSignup, UserLogin, TokenResponse, TokenRefresh
+from app.services.auth_service import hash_password, verify_password
+
+router = APIRouter()
+
+
+@router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+async def signup(data: UserSignup, db: AsyncSession = Depends(get_async_db)):
+    if await _user_by_email(db, data.email):
+        raise _email_taken()
+
+    # bcrypt is deliberately slow; keep it off the event loop
+    user = _new_user(data, await run_in_threadpool(hash_password, data.password))
+    db.add(user)
+    await db.commit()
+
+    return _tokens(user)
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await _user_by_email(db, data.email)
+    if not user or not await run_in_threadpool(verify_password, data.password, user.hashed_password):
+        raise _invalid_credentials()
+
+    return _tokens(user)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(data: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, _refresh_user_id(data.refresh_token))
+    if not user:
+        raise _user_not_found()
+
+    return _tokens(user)
+
+
+async def _user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+
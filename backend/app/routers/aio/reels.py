@@ -0,0 +1,184 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models import User, Reel
+from app.schemas import (
+    ReelCreate, ReelResponse, ReelList, ScriptUpdate,
+    ReelBatchCreate, ReelBatchGenerate, ReelBatchResponse,
+)
+from app.middleware.auth import get_current_user_async
+from app.routers.reels import (
+    reel_events, _list_statement, _count_statement, _capped_total, _reel_page, _download_response,
+    _owned_reels_statement, _found, _require_onboarded, _require_script_editable, _require_downloadable,
+    _require_generatable, _start_pipeline, _new_reel, _new_batch_reels, _enqueue_script_batch,
+    _created_batch_response, _start_batch_pipelines, _generated_batch_response,
+)
+from app.services.events_service import publish_reel
+from app.services.pipeline_service import OUTPUT_FIELDS, delete_outputs
+from app.services.queue_service import enqueue
+from app.services.storage_service import file_exists
+from config import get_settings
+
+settings = get_settings()
+router = APIRouter()
+
+
+@router.post("/", response_model=ReelResponse, status_code=status.HTTP_201_CREATED)
+async def create_reel(
+    data: ReelCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    _require_onboarded(current_user)
+
+    reel = _new_reel(current_user.id, data)
+    db.add(reel)
+    await db.flush()
+
+    # Queue script generation for a worker
+    enqueue(db, "script", reel.id, payload={"fresh": True} if data.fresh_script else None)
+    await db.commit()
+
+    return reel
+
+
+@router.post("/batch", response_model=ReelBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_reels_batch(
+    data: ReelBatchCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Create several reels in one transaction and queue their scripts as a single job."""
+    _require_onboarded(current_user)
+
+    results, reels = _new_batch_reels(current_user.id, data)
+    if reels:
+        db.add_all(reel for _, reel, _ in reels)
+        await db.flush()
+        _enqueue_script_batch(db, reels)
+        await db.commit()
+
+    return _created_batch_response(results, reels)
+
+
+@router.post("/batch/generate", response_model=ReelBatchResponse)
+async def generate_reels_batch(
+    data: ReelBatchGenerate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Start the full pipeline for several reels in one transaction."""
+    owned = await db.scalars(_owned_reels_statement(data.reel_ids, current_user.id))
+    reels_by_id = {reel.id: reel for reel in owned}
+
+    results, queued = _start_batch_pipelines(db, data.reel_ids, reels_by_id)
+    await db.commit()
+    for reel in queued:
+        await _publish(reel)
+    # expire_on_commit is off, so filling in the reels needs no reload
+    return _generated_batch_response(results, queued, data.reel_ids, reels_by_id)
+
+
+@router.get("/", response_model=ReelList)
+async def list_reels(
+    cursor: Optional[str] = None,
+    page: Optional[int] = Query(None, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    include_total: bool = False,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Async twin of the sync list_reels; see there for the paging contract."""
+    if cursor:
+        page = None
+    rows = (await db.execute(_list_statement(current_user.id, cursor, page, per_page))).all()
+
+    total, total_capped = None, False
+    if include_total or page is not None:
+        total, total_capped = _capped_total((await db.execute(_count_statement(current_user.id))).scalar())
+
+    return _reel_page(rows, per_page, page, total, total_capped)
+
+
+# The SSE stream never touches the database; share the sync router's endpoint
+router.add_api_route("/events", reel_events, methods=["GET"])
+
+
+@router.get("/{reel_id}", response_model=ReelResponse)
+async def get_reel(
+    reel_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await _get_owned_reel(db, reel_id, current_user.id)
+
+
+@router.put("/{reel_id}/script", response_model=ReelResponse)
+async def update_script(
+    reel_id: int,
+    data: ScriptUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    reel = await _get_owned_reel(db, reel_id, current_user.id)
+    _require_script_editable(reel)
+
+    reel.script_text = data.script_text
+    await db.commit()
+    return reel
+
+
+@router.post("/{reel_id}/generate", response_model=ReelResponse)
+async def generate_reel(
+    reel_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    reel = await _get_owned_reel(db, reel_id, current_user.id)
+    _require_generatable(reel)
+
+    _start_pipeline(db, reel)
+    await db.commit()
+    await _publish(reel)
+    return reel
+
+
+@router.get("/{reel_id}/download")
+async def download_reel(
+    reel_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    reel = await _get_owned_reel(db, reel_id, current_user.id)
+    _require_downloadable(reel)
+
+    if not await run_in_threadpool(file_exists, reel.video_final_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
+
+    return _download_response(reel)
+
+
+@router.delete("/{reel_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_reel(
+    reel_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    reel = await _get_owned_reel(db, reel_id, current_user.id)
+    outputs = [getattr(reel, name) for name in OUTPUT_FIELDS]
+    await db.delete(reel)
+    await db.commit()
+    await run_in_threadpool(delete_outputs, *outputs)
+
+
+async def _get_owned_reel(db: AsyncSession, reel_id: int, user_id: int) -> Reel:
+    return _found((await db.scalars(_owned_reels_statement([reel_id], user_id))).first())
+
+
+async def _publish(reel: Reel) -> None:
+    # The Postgres events backend NOTIFYs through the sync engine
+    await run_in_threadpool(publish_reel, reel)
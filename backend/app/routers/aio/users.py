@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models import User
+from app.schemas import UserProfile, UserUpdate
+from app.middleware.auth import get_current_user_async
+from app.routers.users import (
+    store_photo, store_voice_sample, delete_photos, delete_voice_sample,
+    _found, _apply_update, _set_photo, _set_voice_sample,
+)
+from app.services.user_cache import invalidate_user
+from config import get_settings
+
+settings = get_settings()
+router = APIRouter()
+
+
+@router.get("/me", response_model=UserProfile)
+async def get_profile(current_user: User = Depends(get_current_user_async)):
+    return current_user
+
+
+@router.put("/me", response_model=UserProfile)
+async def update_profile(
+    data: UserUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    user = await _load_for_update(db, current_user)
+    _apply_update(user, data)
+    return await _save(db, user)
+
+
+@router.post("/me/photo", response_model=UserProfile)
+async def upload_photo(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rel_path, normalized_path = await run_in_threadpool(store_photo, file.file, file.filename or "photo.jpg")
+
+    user = await _load_for_update(db, current_user)
+    await run_in_threadpool(delete_photos, user)
+    _set_photo(user, rel_path, normalized_path)
+    return await _save(db, user)
+
+
+@router.post("/me/voice-sample", response_model=UserProfile)
+async def upload_voice_sample(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rel_path = await run_in_threadpool(store_voice_sample, file.file, file.filename or "audio.wav")
+
+    user = await _load_for_update(db, current_user)
+    await run_in_threadpool(delete_voice_sample, user)
+    _set_voice_sample(db, user, rel_path)
+    return await _save(db, user)
+
+
+async def _load_for_update(db: AsyncSession, current_user: User) -> User:
+    # current_user may be a shared cached snapshot; never mutate it directly
+    return _found(await db.get(User, current_user.id))
+
+
+async def _save(db: AsyncSession, user: User) -> User:
+    await db.commit()
+    await db.refresh(user)
+    # Invalidation may NOTIFY through the sync engine
+    await run_in_threadpool(invalidate_user, user.id)
+    return user
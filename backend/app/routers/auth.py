@@ -15,61 +15,79 @@ router = APIRouter()
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 def signup(data: UserSignup, db: Session = Depends(get_db)):
     if get_user_by_email(db, data.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
+        raise _email_taken()
 
-    user = User(
-        email=data.email,
-        hashed_password=hash_password(data.password),
-        full_name=data.full_name,
-        specialization=data.specialization,
-    )
+    user = _new_user(data, hash_password(data.password))
     db.add(user)
     db.commit()
     db.refresh(user)
 
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
-
-    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+    return _tokens(user)
 
 
 @router.post("/login", response_model=TokenResponse)
 def login(data: UserLogin, db: Session = Depends(get_db)):
     user = authenticate_user(db, data.email, data.password)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-        )
-
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+        raise _invalid_credentials()
 
-    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+    return _tokens(user)
 
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh(data: TokenRefresh, db: Session = Depends(get_db)):
-    payload = decode_token(data.refresh_token)
+    user = db.get(User, _refresh_user_id(data.refresh_token))
+    if not user:
+        raise _user_not_found()
+
+    return _tokens(user)
+
+
+# Shared with the async router (app/routers/aio/auth.py)
+
+def _new_user(data: UserSignup, hashed_password: str) -> User:
+    return User(
+        email=data.email,
+        hashed_password=hashed_password,
+        full_name=data.full_name,
+        specialization=data.specialization,
+    )
+
+
+def _refresh_user_id(refresh_token: str) -> int:
+    payload = decode_token(refresh_token)
 
     if payload is None or payload.get("type") != "refresh":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
+    return int(payload.get("sub"))
 
-    user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+def _tokens(user: User) -> TokenResponse:
+    return TokenResponse(
+        access_token=create_access_token(data={"sub": str(user.id)}),
+        refresh_token=create_refresh_token(data={"sub": str(user.id)}),
+    )
 
-    return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+
+def _email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already registered",
+    )
+
+
+def _invalid_credentials() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password",
+    )
+
+
+def _user_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="User not found",
+    )
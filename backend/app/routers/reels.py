@@ -1,14 +1,27 @@
-import os
+import asyncio
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 
-from app.database import get_db, SessionLocal
+from app.database import get_db
 from app.models import User, Reel
-from app.schemas import ReelCreate, ReelResponse, ReelList, ScriptUpdate
-from app.middleware.auth import get_current_user
-from app.services.pipeline_service import run_script_generation, run_full_pipeline
+from app.schemas import (
+    ReelCreate, ReelResponse, ReelList, ScriptUpdate,
+    ReelBatchCreate, ReelBatchGenerate, ReelBatchItemResult, ReelBatchResponse,
+)
+from app.middleware.auth import get_current_user, get_stream_user
+from app.services.events_service import get_bus, user_channel, publish_reel, reaches_web_process
+from app.services.pipeline_service import OUTPUT_FIELDS, delete_outputs
+from app.services.queue_service import enqueue
+from app.services.storage_service import file_exists, is_remote_storage, local_path, presign_url
 from config import get_settings
 
 settings = get_settings()
@@ -18,43 +31,114 @@ router = APIRouter()
 @router.post("/", response_model=ReelResponse, status_code=status.HTTP_201_CREATED)
 def create_reel(
     data: ReelCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    if not current_user.is_onboarded:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Complete onboarding first (upload photo and voice sample)",
-        )
+    _require_onboarded(current_user)
 
-    reel = Reel(
-        user_id=current_user.id,
-        topic=data.topic,
-        language=data.language,
-        status="pending",
-    )
+    reel = _new_reel(current_user.id, data)
     db.add(reel)
+    db.flush()
+
+    # Queue script generation for a worker
+    enqueue(db, "script", reel.id, payload={"fresh": True} if data.fresh_script else None)
     db.commit()
     db.refresh(reel)
 
-    # Trigger script generation in background
-    background_tasks.add_task(run_script_generation, reel.id, SessionLocal)
-
     return reel
 
 
+@router.post("/batch", response_model=ReelBatchResponse, status_code=status.HTTP_201_CREATED)
+def create_reels_batch(
+    data: ReelBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create several reels in one transaction and queue their scripts as a single job."""
+    _require_onboarded(current_user)
+
+    results, reels = _new_batch_reels(current_user.id, data)
+    if reels:
+        db.add_all(reel for _, reel, _ in reels)
+        db.flush()
+        _enqueue_script_batch(db, reels)
+        db.commit()
+
+    return _created_batch_response(results, reels)
+
+
+@router.post("/batch/generate", response_model=ReelBatchResponse)
+def generate_reels_batch(
+    data: ReelBatchGenerate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Start the full pipeline for several reels in one transaction."""
+    reels_by_id = {reel.id: reel for reel in db.scalars(_owned_reels_statement(data.reel_ids, current_user.id))}
+
+    results, queued = _start_batch_pipelines(db, data.reel_ids, reels_by_id)
+    db.commit()
+    for reel in queued:
+        publish_reel(reel)
+    return _generated_batch_response(results, queued, data.reel_ids, reels_by_id)
+
+
 @router.get("/", response_model=ReelList)
 def list_reels(
-    page: int = 1,
-    per_page: int = 10,
+    cursor: Optional[str] = None,
+    page: Optional[int] = Query(None, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    include_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Reel).filter(Reel.user_id == current_user.id)
-    total = query.count()
-    reels = query.order_by(Reel.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    return ReelList(reels=reels, total=total, page=page, per_page=per_page)
+    """
+    Newest-first reel summaries. Pass the returned next_cursor to get the
+    following page; each call costs O(per_page) on the (user_id, created_at)
+    index. page= is the legacy OFFSET paging and always includes the total.
+    """
+    if cursor:
+        page = None
+    rows = db.execute(_list_statement(current_user.id, cursor, page, per_page)).all()
+
+    total, total_capped = None, False
+    if include_total or page is not None:
+        total, total_capped = _capped_total(db.execute(_count_statement(current_user.id)).scalar())
+
+    return _reel_page(rows, per_page, page, total, total_capped)
+
+
+@router.get("/events")
+async def reel_events(
+    reel_id: Optional[int] = None,
+    current_user: User = Depends(get_stream_user),
+):
+    """Server-sent events with status/progress changes for the user's reels (optionally one reel)."""
+    if not reaches_web_process():
+        # A separate worker's events would never arrive; clients fall back to polling
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live events need EVENTS_BACKEND=postgres or an embedded worker",
+        )
+
+    async def stream():
+        async with get_bus().subscribe(user_channel(current_user.id)) as queue:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if reel_id is not None and event.get("reel_id") != reel_id:
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{reel_id}", response_model=ReelResponse)
@@ -63,10 +147,7 @@ def get_reel(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    reel = db.query(Reel).filter(Reel.id == reel_id, Reel.user_id == current_user.id).first()
-    if not reel:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reel not found")
-    return reel
+    return _get_owned_reel(db, reel_id, current_user.id)
 
 
 @router.put("/{reel_id}/script", response_model=ReelResponse)
@@ -76,15 +157,8 @@ def update_script(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    reel = db.query(Reel).filter(Reel.id == reel_id, Reel.user_id == current_user.id).first()
-    if not reel:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reel not found")
-
-    if reel.status not in ("script_ready", "failed"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Script can only be edited when status is 'script_ready' or 'failed' (current: {reel.status})",
-        )
+    reel = _get_owned_reel(db, reel_id, current_user.id)
+    _require_script_editable(reel)
 
     reel.script_text = data.script_text
     db.commit()
@@ -95,27 +169,16 @@ def update_script(
 @router.post("/{reel_id}/generate", response_model=ReelResponse)
 def generate_reel(
     reel_id: int,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    reel = db.query(Reel).filter(Reel.id == reel_id, Reel.user_id == current_user.id).first()
-    if not reel:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reel not found")
-
-    if reel.status not in ("script_ready", "failed"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Can only generate when status is 'script_ready' or 'failed' (current: {reel.status})",
-        )
-
-    reel.error_message = None
-    # Trigger full pipeline in background
-    background_tasks.add_task(run_full_pipeline, reel.id, SessionLocal)
+    reel = _get_owned_reel(db, reel_id, current_user.id)
+    _require_generatable(reel)
 
-    reel.status = "generating_audio"
+    _start_pipeline(db, reel)
     db.commit()
     db.refresh(reel)
+    publish_reel(reel)
     return reel
 
 
@@ -125,25 +188,21 @@ def download_reel(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    reel = db.query(Reel).filter(Reel.id == reel_id, Reel.user_id == current_user.id).first()
-    if not reel:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reel not found")
+    reel = _get_owned_reel(db, reel_id, current_user.id)
+    _require_downloadable(reel)
 
-    if reel.status != "completed" or not reel.video_final_path:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Reel is not ready for download",
-        )
-
-    abs_path = os.path.join(settings.STORAGE_PATH, reel.video_final_path)
-    if not os.path.exists(abs_path):
+    if not file_exists(reel.video_final_path):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Video file not found")
 
-    return FileResponse(
-        abs_path,
-        media_type="video/mp4",
-        filename=f"reel_{reel.id}.mp4",
-    )
+    return _download_response(reel)
+
+
+def _download_response(reel: Reel):
+    filename = f"reel_{reel.id}.mp4"
+    if is_remote_storage():
+        # The object store serves the bytes; the API only signs the request
+        return RedirectResponse(presign_url(reel.video_final_path, download_name=filename))
+    return FileResponse(local_path(reel.video_final_path), media_type="video/mp4", filename=filename)
 
 
 @router.delete("/{reel_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -152,9 +211,187 @@ def delete_reel(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    reel = db.query(Reel).filter(Reel.id == reel_id, Reel.user_id == current_user.id).first()
+    reel = _get_owned_reel(db, reel_id, current_user.id)
+    outputs = [getattr(reel, name) for name in OUTPUT_FIELDS]
+    db.delete(reel)
+    db.commit()
+    delete_outputs(*outputs)
+
+
+# Validation, ownership and state changes below are shared with the async
+# routers (app/routers/aio/reels.py); they never do I/O, except enqueue,
+# which only adds a row to the session
+
+def _owned_reels_statement(reel_ids: list, user_id: int):
+    return select(Reel).where(Reel.id.in_(reel_ids), Reel.user_id == user_id)
+
+
+def _get_owned_reel(db: Session, reel_id: int, user_id: int) -> Reel:
+    return _found(db.scalars(_owned_reels_statement([reel_id], user_id)).first())
+
+
+def _found(reel: Optional[Reel]) -> Reel:
     if not reel:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reel not found")
+    return reel
 
-    db.delete(reel)
-    db.commit()
+
+def _require_onboarded(user: User) -> None:
+    if not user.is_onboarded:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Complete onboarding first (upload photo and voice sample)",
+        )
+
+
+def _require_script_editable(reel: Reel) -> None:
+    if reel.status not in ("script_ready", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Script can only be edited when status is 'script_ready' or 'failed' (current: {reel.status})",
+        )
+
+
+def _require_downloadable(reel: Reel) -> None:
+    if reel.status != "completed" or not reel.video_final_path:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Reel is not ready for download",
+        )
+
+
+def _generate_error(reel: Reel) -> Optional[str]:
+    """Why the pipeline can't start for this reel, or None if it can."""
+    if reel.status not in ("script_ready", "failed", "completed"):
+        return f"Can only generate when status is 'script_ready', 'failed' or 'completed' (current: {reel.status})"
+    return None
+
+
+def _require_generatable(reel: Reel) -> None:
+    error = _generate_error(reel)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+
+def _start_pipeline(db, reel: Reel) -> None:
+    reel.error_message = None
+    # Queue full pipeline for a worker
+    enqueue(db, "pipeline", reel.id)
+    reel.status = "generating_audio"
+
+
+def _new_reel(user_id: int, data: ReelCreate) -> Reel:
+    return Reel(
+        user_id=user_id,
+        topic=data.topic,
+        language=data.language,
+        encode_profile=data.encode_profile,
+        status="pending",
+    )
+
+
+def _new_batch_reels(user_id: int, data: ReelBatchCreate):
+    """Validate each batch item; returns (results for invalid items, [(index, new reel, fresh_script)])."""
+    results = []
+    reels = []
+    for index, item in enumerate(data.items):
+        try:
+            reel_data = ReelCreate.model_validate(item)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append(ReelBatchItemResult(index=index, ok=False, error=error))
+            continue
+        reels.append((index, _new_reel(user_id, reel_data), reel_data.fresh_script))
+    return results, reels
+
+
+def _enqueue_script_batch(db, reels: list) -> None:
+    enqueue(db, "script_batch", payload={
+        "reel_ids": [reel.id for _, reel, _ in reels],
+        "fresh_reel_ids": [reel.id for _, reel, fresh in reels if fresh],
+    })
+
+
+def _created_batch_response(results: list, reels: list) -> ReelBatchResponse:
+    for index, reel, _ in reels:
+        results.append(ReelBatchItemResult(index=index, ok=True, reel=ReelResponse.model_validate(reel)))
+    results.sort(key=lambda r: r.index)
+    return ReelBatchResponse(results=results, succeeded=len(reels), failed=len(results) - len(reels))
+
+
+def _start_batch_pipelines(db, reel_ids: list, reels_by_id: dict):
+    """Start every startable reel; returns (per-item results, reels queued). Reels are filled in after commit."""
+    results = []
+    queued = []
+    for index, reel_id in enumerate(reel_ids):
+        reel = reels_by_id.get(reel_id)
+        error = _generate_error(reel) if reel else "Reel not found"
+        if error:
+            results.append(ReelBatchItemResult(index=index, ok=False, error=error))
+            continue
+        _start_pipeline(db, reel)
+        queued.append(reel)
+        results.append(ReelBatchItemResult(index=index, ok=True, reel=None))
+    return results, queued
+
+
+def _generated_batch_response(results: list, queued: list, reel_ids: list, reels_by_id: dict) -> ReelBatchResponse:
+    for result in results:
+        if result.ok:
+            result.reel = ReelResponse.model_validate(reels_by_id[reel_ids[result.index]])
+    return ReelBatchResponse(results=results, succeeded=len(queued), failed=len(results) - len(queued))
+
+
+def _encode_cursor(row) -> str:
+    raw = json.dumps([row.created_at.isoformat(), row.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, reel_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(reel_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _list_statement(user_id: int, cursor: Optional[str], page: Optional[int], per_page: int):
+    """Summary rows for one page, plus one extra row to detect a next page without counting."""
+    preview_chars = settings.REEL_LIST_PREVIEW_CHARS
+    stmt = select(
+        Reel.id, Reel.topic, Reel.language, Reel.status,
+        func.substr(Reel.script_text, 1, preview_chars).label("script_preview"),
+        func.substr(Reel.error_message, 1, preview_chars).label("error_message"),
+        Reel.duration_seconds, Reel.progress_percent, Reel.created_at, Reel.completed_at,
+    ).where(Reel.user_id == user_id)
+
+    if cursor:
+        created_at, reel_id = _decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            Reel.created_at < created_at,
+            and_(Reel.created_at == created_at, Reel.id < reel_id),
+        ))
+    stmt = stmt.order_by(Reel.created_at.desc(), Reel.id.desc())
+    if page and page > 1:
+        stmt = stmt.offset((page - 1) * per_page)
+    return stmt.limit(per_page + 1)
+
+
+def _count_statement(user_id: int):
+    """Count a user's reels, stopping at REEL_LIST_COUNT_CAP + 1 so huge libraries stay cheap."""
+    ids = select(Reel.id).where(Reel.user_id == user_id).limit(settings.REEL_LIST_COUNT_CAP + 1).subquery()
+    return select(func.count()).select_from(ids)
+
+
+def _capped_total(count: int) -> Tuple[int, bool]:
+    cap = settings.REEL_LIST_COUNT_CAP
+    return min(count, cap), count > cap
+
+
+def _reel_page(rows, per_page: int, page: Optional[int], total: Optional[int], total_capped: bool) -> ReelList:
+    next_cursor = _encode_cursor(rows[per_page - 1]) if len(rows) > per_page else None
+    return ReelList(
+        reels=rows[:per_page], total=total, total_capped=total_capped,
+        page=page, per_page=per_page, next_cursor=next_cursor,
+    )
@@ -1,15 +1,28 @@
+import logging
+import os
+from typing import BinaryIO, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import User
 from app.schemas import UserProfile, UserUpdate
 from app.middleware.auth import get_current_user
-from app.services.storage_service import save_upload, delete_file
-from app.utils.validation import validate_image, validate_audio, convert_audio_to_wav
+from app.services.photo_service import normalize_photo
+from app.services.queue_service import enqueue
+from app.services.storage_service import (
+    UploadTooLargeError, stage_upload, save_staged, discard_staged,
+    unique_rel_path, get_storage_path, put_file, delete_file,
+)
+from app.services.tts_service import delete_speaker_conditioning
+from app.services.user_cache import invalidate_user
+from app.utils.validation import validate_image, validate_audio, check_audio_duration, convert_audio_to_wav
 from config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
@@ -24,13 +37,9 @@ def update_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    if data.full_name is not None:
-        current_user.full_name = data.full_name
-    if data.specialization is not None:
-        current_user.specialization = data.specialization
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    user = _load_for_update(db, current_user)
+    _apply_update(user, data)
+    return _save(db, user)
 
 
 @router.post("/me/photo", response_model=UserProfile)
@@ -39,25 +48,8 @@ async def upload_photo(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    file_bytes = await file.read()
-    is_valid, error = validate_image(
-        file_bytes,
-        max_size_mb=settings.MAX_IMAGE_SIZE_MB,
-        min_dimension=settings.MIN_IMAGE_DIMENSION,
-    )
-    if not is_valid:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-
-    # Delete old photo if exists
-    if current_user.photo_path:
-        delete_file(current_user.photo_path)
-
-    rel_path = save_upload(file_bytes, "uploads/photos", file.filename or "photo.jpg")
-    current_user.photo_path = rel_path
-    _check_onboarded(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    rel_path, normalized_path = await run_in_threadpool(store_photo, file.file, file.filename or "photo.jpg")
+    return await run_in_threadpool(_replace_photo, db, current_user, rel_path, normalized_path)
 
 
 @router.post("/me/voice-sample", response_model=UserProfile)
@@ -66,30 +58,158 @@ async def upload_voice_sample(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    file_bytes = await file.read()
-    is_valid, error = validate_audio(
-        file_bytes,
-        file.filename or "audio.wav",
-        max_size_mb=settings.MAX_AUDIO_SIZE_MB,
-        min_duration_s=settings.MIN_VOICE_DURATION_S,
-        max_duration_s=settings.MAX_VOICE_DURATION_S,
-    )
-    if not is_valid:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
-
-    # Convert to WAV 22050Hz mono
-    wav_bytes = convert_audio_to_wav(file_bytes, file.filename or "audio.wav")
-
-    # Delete old voice sample if exists
-    if current_user.voice_sample_path:
-        delete_file(current_user.voice_sample_path)
-
-    rel_path = save_upload(wav_bytes, "uploads/voice_samples", "voice.wav")
-    current_user.voice_sample_path = rel_path
-    _check_onboarded(current_user)
+    rel_path = await run_in_threadpool(store_voice_sample, file.file, file.filename or "audio.wav")
+    return await run_in_threadpool(_replace_voice_sample, db, current_user, rel_path)
+
+
+def store_photo(src: BinaryIO, filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Stream, validate and store a profile photo plus its normalized lip-sync
+    copy. Returns both relative paths; the second is None if normalization failed.
+    """
+    staged = _stage(src, filename, settings.MAX_IMAGE_SIZE_MB)
+    try:
+        is_valid, error = validate_image(
+            staged.path,
+            max_size_mb=settings.MAX_IMAGE_SIZE_MB,
+            min_dimension=settings.MIN_IMAGE_DIMENSION,
+        )
+        if not is_valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+        rel_path = save_staged(staged, "uploads/photos")
+    finally:
+        discard_staged(staged)
+
+    try:
+        normalized_path = normalize_photo(rel_path)
+    except Exception as e:
+        # Lip-sync falls back to the original photo
+        logger.warning(f"Photo normalization failed for {rel_path}: {e}")
+        normalized_path = None
+    return rel_path, normalized_path
+
+
+def delete_photos(user: User) -> None:
+    """Delete the user's current photo and its normalized copy, if they exist."""
+    for old_path in (user.photo_path, user.photo_normalized_path):
+        if old_path:
+            delete_file(old_path)
+
+
+def delete_voice_sample(user: User) -> None:
+    """Delete the user's current voice sample and its cached speaker conditioning, if they exist."""
+    if user.voice_sample_path:
+        delete_speaker_conditioning(user.voice_sample_path)
+        delete_file(user.voice_sample_path)
+
+
+def store_voice_sample(src: BinaryIO, filename: str) -> str:
+    """Stream, validate and store a voice sample as WAV 22050Hz mono; returns its relative path."""
+    staged = _stage(src, filename, settings.MAX_AUDIO_SIZE_MB)
+    try:
+        is_valid, error = validate_audio(
+            staged.path,
+            filename,
+            max_size_mb=settings.MAX_AUDIO_SIZE_MB,
+            min_duration_s=settings.MIN_VOICE_DURATION_S,
+            max_duration_s=settings.MAX_VOICE_DURATION_S,
+        )
+        if not is_valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+        # Decode once, straight to WAV 22050Hz mono
+        rel_path = unique_rel_path("uploads/voice_samples", "voice.wav")
+        wav_path = get_storage_path(rel_path)
+        try:
+            duration_s = convert_audio_to_wav(
+                staged.path, wav_path, max_duration_s=settings.MAX_VOICE_DURATION_S,
+            )
+        except RuntimeError:
+            _remove(wav_path)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not read audio file")
+
+        # Re-check against the decoded length, for inputs without duration metadata
+        is_valid, error = check_audio_duration(
+            duration_s, settings.MIN_VOICE_DURATION_S, settings.MAX_VOICE_DURATION_S,
+        )
+        if not is_valid:
+            _remove(wav_path)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+        return put_file(wav_path, rel_path)
+    finally:
+        discard_staged(staged)
+
+
+def _stage(src: BinaryIO, filename: str, max_size_mb: int):
+    try:
+        return stage_upload(src, filename, max_size_mb * 1024 * 1024)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large (max {max_size_mb}MB)",
+        )
+
+
+def _remove(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _replace_photo(db: Session, current_user: User, rel_path: str, normalized_path: Optional[str]) -> User:
+    # Blocking DB and storage calls; the async handler runs this in the threadpool
+    user = _load_for_update(db, current_user)
+    delete_photos(user)
+    _set_photo(user, rel_path, normalized_path)
+    return _save(db, user)
+
+
+def _replace_voice_sample(db: Session, current_user: User, rel_path: str) -> User:
+    user = _load_for_update(db, current_user)
+    delete_voice_sample(user)
+    _set_voice_sample(db, user, rel_path)
+    return _save(db, user)
+
+
+def _load_for_update(db: Session, current_user: User) -> User:
+    # current_user may be a shared cached snapshot; never mutate it directly
+    return _found(db.get(User, current_user.id))
+
+
+# Shared with the async router (app/routers/aio/users.py); no I/O apart from
+# enqueue, which only adds a row to the session
+
+def _found(user: Optional[User]) -> User:
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+def _apply_update(user: User, data: UserUpdate) -> None:
+    if data.full_name is not None:
+        user.full_name = data.full_name
+    if data.specialization is not None:
+        user.specialization = data.specialization
+
+
+def _set_photo(user: User, rel_path: str, normalized_path: Optional[str]) -> None:
+    user.photo_path = rel_path
+    user.photo_normalized_path = normalized_path
+    _check_onboarded(user)
+
+
+def _set_voice_sample(db, user: User, rel_path: str) -> None:
+    user.voice_sample_path = rel_path
+    _check_onboarded(user)
+    # Precompute speaker conditioning on a worker so reels can reuse it
+    enqueue(db, "speaker_conditioning", payload={"voice_sample_path": rel_path})
+
+
+def _save(db: Session, user: User) -> User:
     db.commit()
-    db.refresh(current_user)
-    return current_user
+    db.refresh(user)
+    invalidate_user(user.id)
+    return user
 
 
 def _check_onboarded(user: User) -> None:
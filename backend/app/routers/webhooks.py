@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Request, status
+
+from app.services.replicate_client import get_client, verify_webhook, webhooks_enabled
+
+router = APIRouter()
+
+
+@router.post("/replicate", status_code=status.HTTP_204_NO_CONTENT)
+async def replicate_webhook(request: Request):
+    if not webhooks_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    body = await request.body()
+    if not verify_webhook(body, request.headers):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook signature")
+
+    # Predictions awaited in other processes fall back to polling
+    get_client().deliver_webhook(await request.json())
@@ -1,11 +1,13 @@
 from app.schemas.schemas import (
     UserSignup, UserLogin, TokenResponse, TokenRefresh,
     UserProfile, UserUpdate,
-    ReelCreate, ReelResponse, ReelList, ScriptUpdate,
+    ReelCreate, ReelResponse, ReelSummary, ReelList, ScriptUpdate,
+    ReelBatchCreate, ReelBatchGenerate, ReelBatchItemResult, ReelBatchResponse,
 )
 
 __all__ = [
     "UserSignup", "UserLogin", "TokenResponse", "TokenRefresh",
     "UserProfile", "UserUpdate",
-    "ReelCreate", "ReelResponse", "ReelList", "ScriptUpdate",
+    "ReelCreate", "ReelResponse", "ReelSummary", "ReelList", "ScriptUpdate",
+    "ReelBatchCreate", "ReelBatchGenerate", "ReelBatchItemResult", "ReelBatchResponse",
 ]
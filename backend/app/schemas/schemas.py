@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Any, Dict
 from datetime import datetime
 
 
@@ -54,6 +54,8 @@ class UserUpdate(BaseModel):
 class ReelCreate(BaseModel):
     topic: str = Field(min_length=3, max_length=500)
     language: str = Field(default="en", pattern="^(en|hi)$")
+    encode_profile: Optional[str] = Field(default=None, pattern="^(draft|standard|archive)$")
+    fresh_script: bool = False  # bypass the shared script cache
 
 
 class ReelResponse(BaseModel):
@@ -61,12 +63,31 @@ class ReelResponse(BaseModel):
     topic: str
     language: str
     status: str
+    encode_profile: Optional[str] = None
     script_text: Optional[str] = None
     audio_path: Optional[str] = None
     video_raw_path: Optional[str] = None
     video_final_path: Optional[str] = None
     error_message: Optional[str] = None
     duration_seconds: Optional[float] = None
+    progress_percent: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class ReelSummary(BaseModel):
+    """List projection: no artifact paths, long text columns truncated."""
+    id: int
+    topic: str
+    language: str
+    status: str
+    script_preview: Optional[str] = None
+    error_message: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    progress_percent: Optional[float] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
 
@@ -74,10 +95,34 @@ class ReelResponse(BaseModel):
 
 
 class ReelList(BaseModel):
-    reels: List[ReelResponse]
-    total: int
-    page: int
+    reels: List[ReelSummary]
+    total: Optional[int] = None  # None unless requested; capped at REEL_LIST_COUNT_CAP
+    total_capped: bool = False
+    page: Optional[int] = None  # only for legacy offset paging
     per_page: int
+    next_cursor: Optional[str] = None
+
+
+class ReelBatchCreate(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the batch
+    items: List[Dict[str, Any]] = Field(min_length=1, max_length=30)
+
+
+class ReelBatchGenerate(BaseModel):
+    reel_ids: List[int] = Field(min_length=1, max_length=30)
+
+
+class ReelBatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    reel: Optional[ReelResponse] = None
+    error: Optional[str] = None
+
+
+class ReelBatchResponse(BaseModel):
+    results: List[ReelBatchItemResult]
+    succeeded: int
+    failed: int
 
 
 class ScriptUpdate(BaseModel):
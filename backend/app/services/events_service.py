@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from app.database import engine
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "reelgen_events"
+
+
+class EventBus:
+    """
+    Pub/sub for pipeline events. Subscribers are asyncio queues in the web
+    process; publishers may be any thread. The backend decides how events
+    travel between publishers and subscribers.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._subscribers: dict = {}
+        self._listeners: dict = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, event: dict) -> None:
+        try:
+            self.backend.publish(self, channel, event)
+        except Exception as e:
+            # Events are best-effort; clients can always fall back to GET
+            logger.warning(f"Failed to publish event on {channel}: {e}")
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str, maxsize: int = 100):
+        self.backend.start(self)
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=maxsize))
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def add_listener(self, channel: str, callback) -> None:
+        """Register a plain callback(event) for a channel, called on the delivering thread."""
+        self.backend.start(self)
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(callback)
+
+    def deliver(self, channel: str, event: dict) -> None:
+        """Hand an event to local subscribers of a channel. Thread-safe."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+            listeners = list(self._listeners.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_put_latest, queue, event)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning(f"Event listener on {channel} failed: {e}")
+
+
+def _put_latest(queue: asyncio.Queue, event: dict) -> None:
+    # A slow client drops its oldest events rather than blocking publishers
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+class MemoryBackend:
+    """Single-process delivery; publishers and subscribers share the process."""
+
+    cross_process = False
+
+    def start(self, bus: EventBus) -> None:
+        pass
+
+    def publish(self, bus: EventBus, channel: str, event: dict) -> None:
+        bus.deliver(channel, event)
+
+
+class PostgresNotifyBackend:
+    """
+    Cross-process delivery over Postgres LISTEN/NOTIFY, for deployments
+    where workers and web replicas are separate processes. LISTEN and
+    NOTIFY each use one long-lived connection of their own, outside the
+    engine's pool, so events never take pool connections from requests.
+    """
+
+    cross_process = True
+
+    def __init__(self):
+        self._started = False
+        self._lock = threading.Lock()
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+
+    def start(self, bus: EventBus) -> None:
+        with self._lock:
+            if not self._started:
+                threading.Thread(target=self._listen, args=(bus,), name="pg-listen", daemon=True).start()
+                self._started = True
+
+    def publish(self, bus: EventBus, channel: str, event: dict) -> None:
+        payload = json.dumps({"channel": channel, "event": event}, default=str)
+        with self._publish_lock:
+            # One retry on a fresh connection covers a server restart since the last event
+            for attempt in range(2):
+                if self._publish_conn is None:
+                    self._publish_conn = _connect()
+                try:
+                    cursor = self._publish_conn.cursor()
+                    try:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (PG_CHANNEL, payload))
+                    finally:
+                        cursor.close()
+                    return
+                except Exception:
+                    _close_quietly(self._publish_conn)
+                    self._publish_conn = None
+                    if attempt:
+                        raise
+
+    def _listen(self, bus: EventBus) -> None:
+        while True:
+            try:
+                dbapi_conn = _connect()
+                try:
+                    dbapi_conn.cursor().execute(f"LISTEN {PG_CHANNEL}")
+                    logger.info("Listening for pipeline events via Postgres NOTIFY")
+                    while True:
+                        if select.select([dbapi_conn], [], [], 30) == ([], [], []):
+                            continue
+                        dbapi_conn.poll()
+                        while dbapi_conn.notifies:
+                            notify = dbapi_conn.notifies.pop(0)
+                            message = json.loads(notify.payload)
+                            bus.deliver(message["channel"], message["event"])
+                finally:
+                    _close_quietly(dbapi_conn)
+            except Exception as e:
+                logger.error(f"Event listener disconnected: {e}, reconnecting")
+                time.sleep(5)
+
+
+def _connect():
+    """A DBAPI connection of our own, opened outside the engine's pool, in autocommit mode."""
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    conn = engine.dialect.connect(*cargs, **cparams)
+    conn.autocommit = True  # LISTEN needs it; NOTIFY is then sent immediately
+    return conn
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                use_postgres = settings.EVENTS_BACKEND == "postgres" or (
+                    settings.EVENTS_BACKEND == "auto" and engine.dialect.name == "postgresql"
+                )
+                backend = PostgresNotifyBackend() if use_postgres else MemoryBackend()
+                _bus = EventBus(backend)
+    return _bus
+
+
+def reaches_web_process() -> bool:
+    """Whether pipeline events published by workers arrive in this web process."""
+    return get_bus().backend.cross_process or settings.EMBEDDED_WORKER
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def publish_reel(reel) -> None:
+    """Publish a reel's current status and progress to its owner's channel."""
+    get_bus().publish(user_channel(reel.user_id), {
+        "type": "reel",
+        "reel_id": reel.id,
+        "status": reel.status,
+        "progress_percent": reel.progress_percent,
+        "eta_seconds": reel.eta_seconds,
+        "error_message": reel.error_message,
+    })
+
+
+def publish_script_delta(reel, text: str) -> None:
+    """Publish the partial script of a reel while it is being generated."""
+    get_bus().publish(user_channel(reel.user_id), {
+        "type": "script",
+        "reel_id": reel.id,
+        "script_text": text,
+    })
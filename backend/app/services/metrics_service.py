@@ -0,0 +1,44 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.models import WorkerStats
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def report(db: Session, worker_id: str, stats: dict) -> None:
+    """Store this worker's latest snapshot and drop those of workers that stopped reporting."""
+    now = datetime.now(timezone.utc)
+    updated = (
+        db.query(WorkerStats)
+        .filter(WorkerStats.worker_id == worker_id)
+        .update({WorkerStats.stats: json.dumps(stats), WorkerStats.updated_at: now}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(WorkerStats(worker_id=worker_id, stats=json.dumps(stats), updated_at=now))
+    db.query(WorkerStats).filter(WorkerStats.updated_at < _cutoff()).delete(synchronize_session=False)
+    db.commit()
+
+
+def collect(db: Session) -> list:
+    """Latest snapshot of every worker that reported within a job lease."""
+    rows = (
+        db.query(WorkerStats)
+        .filter(WorkerStats.updated_at >= _cutoff())
+        .order_by(WorkerStats.worker_id)
+        .all()
+    )
+    return [
+        {"worker_id": row.worker_id, "updated_at": row.updated_at.isoformat(), **json.loads(row.stats)}
+        for row in rows
+    ]
+
+
+def _cutoff() -> datetime:
+    # A worker silent for a whole lease has lost its jobs too
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_S)
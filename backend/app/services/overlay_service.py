@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+FRAME_WIDTH, FRAME_HEIGHT = 1080, 1920
+
+# Bump when the layout below changes so cached overlays are re-rendered
+OVERLAY_VERSION = "1"
+
+FALLBACK_FONTS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+]
+
+
+def _font_path() -> str:
+    if settings.OVERLAY_FONT_PATH:
+        return settings.OVERLAY_FONT_PATH
+    for path in FALLBACK_FONTS:
+        if os.path.exists(path):
+            return path
+    return ""
+
+
+def overlay_fingerprint() -> str:
+    """Identifies the overlay renderer; part of the final-video fingerprint."""
+    return f"overlay-v{OVERLAY_VERSION}:{_font_path() or 'default'}"
+
+
+def render_overlay(topic: str, doctor_name: str) -> str:
+    """
+    Render the topic and doctor-name captions once into a transparent
+    1080x1920 PNG that FFmpeg composites with a single overlay filter.
+    Returns the absolute path of the cached PNG. The cache keeps the
+    OVERLAY_CACHE_MAX_FILES most recently used overlays.
+    """
+    lines = [
+        # (text, font size, top y) — matches the old drawtext layout
+        (topic[:60], 36, 80),
+        (f"Dr. {doctor_name}", 32, FRAME_HEIGHT - 120),
+    ]
+    font_path = _font_path()
+
+    key = hashlib.sha256(repr((OVERLAY_VERSION, font_path, lines)).encode()).hexdigest()
+    cache_dir = os.path.join(settings.STORAGE_PATH, "cache", "overlays")
+    output_path = os.path.join(cache_dir, f"{key}.png")
+    if os.path.exists(output_path):
+        try:
+            os.utime(output_path)  # mark as recently used
+            return output_path
+        except FileNotFoundError:
+            pass  # evicted just now; render it again
+
+    os.makedirs(cache_dir, exist_ok=True)
+    image = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for text, size, y in lines:
+        font = _load_font(font_path, size)
+        left, _, right, _ = draw.textbbox((0, 0), text, font=font, stroke_width=2)
+        x = (FRAME_WIDTH - (right - left)) // 2
+        draw.text((x, y), text, font=font, fill="white", stroke_width=2, stroke_fill="black")
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, output_path)
+    logger.info(f"Rendered overlay {key[:12]}")
+    _trim_cache(cache_dir)
+    return output_path
+
+
+def _trim_cache(cache_dir: str) -> None:
+    """Remove the least recently used overlays beyond OVERLAY_CACHE_MAX_FILES."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".png"):
+            continue  # in-progress .tmp renders
+        path = os.path.join(cache_dir, name)
+        try:
+            entries.append((os.stat(path).st_mtime, path))
+        except FileNotFoundError:
+            continue
+
+    overflow = len(entries) - settings.OVERLAY_CACHE_MAX_FILES
+    for _, path in sorted(entries)[:max(overflow, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    if overflow > 0:
+        logger.info(f"Evicted {overflow} cached overlay(s)")
+
+
+def _load_font(font_path: str, size: int):
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, size)
+        except OSError:
+            logger.warning(f"Could not load overlay font {font_path}, using Pillow default")
+    return ImageFont.load_default(size=size)
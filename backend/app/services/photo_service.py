@@ -0,0 +1,90 @@
+import logging
+import os
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.services.storage_service import get_storage_path, local_path, put_file, unique_rel_path
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+NORMALIZED_DIR = "uploads/photos_normalized"
+JPEG_QUALITY = 90
+# Where the face center lands vertically in a crop that is shorter than the photo
+FACE_ANCHOR_Y = 0.4
+
+
+def normalize_photo(photo_path: str) -> str:
+    """
+    Build the lip-sync input for an uploaded photo: apply EXIF orientation,
+    crop to PHOTO_ASPECT_RATIO around the face and downscale so the longest
+    side is at most PHOTO_MAX_DIMENSION. Stores a JPEG next to the uploads
+    and returns its storage path. When no face is found (or OpenCV isn't
+    installed) the photo is only downscaled, since a blind crop can cut an
+    off-center face out of the frame.
+    """
+    src_path = local_path(photo_path)
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+
+    face_center = _detect_face_center(img)
+    if face_center:
+        img = img.crop(_crop_box(img.size, _aspect_ratio(), face_center))
+    else:
+        logger.info(f"No face found in {os.path.basename(src_path)}, downscaling without a crop")
+    img.thumbnail((settings.PHOTO_MAX_DIMENSION, settings.PHOTO_MAX_DIMENSION), Image.LANCZOS)
+
+    rel_path = unique_rel_path(NORMALIZED_DIR, "photo.jpg")
+    output_path = get_storage_path(rel_path)
+    img.save(output_path, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    logger.info(
+        f"Normalized photo {os.path.basename(src_path)} to {img.width}x{img.height} "
+        f"({os.path.getsize(src_path)} -> {os.path.getsize(output_path)} bytes)"
+    )
+    return put_file(output_path, rel_path)
+
+
+def _aspect_ratio() -> float:
+    width, height = settings.PHOTO_ASPECT_RATIO.split(":")
+    return float(width) / float(height)
+
+
+def _crop_box(size: Tuple[int, int], aspect: float, face_center: Tuple[float, float]) -> Tuple[int, int, int, int]:
+    """Largest box of the given aspect ratio that keeps the face where a portrait would have it."""
+    width, height = size
+    if width / height > aspect:
+        # Too wide: keep full height, center the face horizontally
+        crop_w = round(height * aspect)
+        left = _clamp(face_center[0] - crop_w / 2, 0, width - crop_w)
+        return left, 0, left + crop_w, height
+
+    # Too tall: keep full width, put the face a bit above the middle
+    crop_h = round(width / aspect)
+    top = _clamp(face_center[1] - crop_h * FACE_ANCHOR_Y, 0, height - crop_h)
+    return 0, top, width, top + crop_h
+
+
+def _clamp(value: float, low: int, high: int) -> int:
+    return int(max(low, min(round(value), high)))
+
+
+def _detect_face_center(img: Image.Image) -> Optional[Tuple[float, float]]:
+    """Center of the largest frontal face, via OpenCV when installed; None otherwise."""
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return None
+
+    # Detect on a small grayscale copy; faces in profile photos are large
+    scale = min(1.0, 640 / max(img.size))
+    small = img.convert("L").resize((round(img.width * scale), round(img.height * scale)))
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    faces = cascade.detectMultiScale(np.asarray(small), scaleFactor=1.1, minNeighbors=5, minSize=(40, 40))
+    if len(faces) == 0:
+        return None
+
+    x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+    return (x + w / 2) / scale, (y + h / 2) / scale
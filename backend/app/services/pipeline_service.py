@@ -1,106 +1,324 @@
+import hashlib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.models import Reel, User
-from app.services.script_service import generate_script
-from app.services.tts_service import generate_tts_audio
+from app.services.script_cache_service import get_or_generate_script
+from app.services.tts_service import generate_tts_audio, prepare_speaker_conditioning
 from app.services.lipsync_service import generate_lipsync_video
-from app.services.video_service import post_process_video
+from app.services.video_service import post_process_video, profile_fingerprint
+from app.services.storage_service import file_sha256, file_exists, delete_file, evict_local
+from app.services.queue_service import enqueue
+from app.services.overlay_service import overlay_fingerprint
+from app.services.events_service import publish_reel, publish_script_delta
+from config import get_settings
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Reels whose script has not been written yet
+SCRIPT_PENDING_STATUSES = ("pending", "generating_script")
+# Stored files a reel owns; each holds one reference in the content-addressed layout
+OUTPUT_FIELDS = ("audio_path", "video_raw_path", "video_final_path")
 
-def run_script_generation(reel_id: int, db_session_factory) -> None:
-    """Generate script for a reel (background task)."""
-    db = db_session_factory()
+# Local TTS and FFmpeg take a CPU slot; a job waiting on a Replicate prediction
+# holds none, so a worker can run more jobs than it has CPU slots
+_cpu_slots = threading.BoundedSemaphore(settings.WORKER_CONCURRENCY)
+
+
+def set_cpu_concurrency(limit: int) -> None:
+    global _cpu_slots
+    _cpu_slots = threading.BoundedSemaphore(limit)
+
+
+@contextmanager
+def cpu_stage(needed: bool = True):
+    """Hold a CPU slot for the duration of a CPU-bound stage."""
+    if not needed:
+        yield
+        return
+    with _cpu_slots:
+        yield
+
+
+def run_script_generation(reel_id: int, db_session_factory, fresh: bool = False) -> None:
+    """Generate script for a reel, reusing a cached one unless fresh (background task)."""
+    reel, _ = _load(db_session_factory, reel_id)
+    if not reel:
+        return
+    if reel.status not in SCRIPT_PENDING_STATUSES:
+        # A requeued job already wrote this script, and the user may have edited it since
+        logger.info(f"Reel {reel_id}: script already generated ({reel.status}), skipping")
+        return
+
+    _save(db_session_factory, reel, status="generating_script")
     try:
-        reel = db.query(Reel).filter(Reel.id == reel_id).first()
-        if not reel:
-            return
+        with _session(db_session_factory) as db:
+            script = get_or_generate_script(
+                db, reel.topic, reel.language, reel.user_id, fresh=fresh,
+                on_delta=lambda text: publish_script_delta(reel, text),
+            )
+        _save(db_session_factory, reel, script_text=script, status="script_ready")
+        logger.info(f"Reel {reel_id}: script generated successfully")
+    except Exception as e:
+        logger.error(f"Reel {reel_id}: script generation failed: {e}")
+        _save(db_session_factory, reel, status="failed", error_message=f"Script generation failed: {str(e)}")
 
-        reel.status = "generating_script"
-        db.commit()
 
-        try:
-            script = generate_script(reel.topic, reel.language)
-            reel.script_text = script
-            reel.status = "script_ready"
-            db.commit()
-            logger.info(f"Reel {reel_id}: script generated successfully")
-        except Exception as e:
-            logger.error(f"Reel {reel_id}: script generation failed: {e}")
-            reel.status = "failed"
-            reel.error_message = f"Script generation failed: {str(e)}"
-            db.commit()
-    finally:
-        db.close()
+def run_batch_script_generation(reel_id, db_session_factory, reel_ids: list, fresh_reel_ids: list = ()) -> None:
+    """Generate scripts for a batch of reels with bounded parallelism (background task)."""
+    with ThreadPoolExecutor(max_workers=settings.SCRIPT_BATCH_PARALLELISM, thread_name_prefix="script") as pool:
+        # Each reel records its own success or failure
+        list(pool.map(
+            lambda rid: run_script_generation(rid, db_session_factory, fresh=rid in fresh_reel_ids),
+            reel_ids,
+        ))
+    logger.info(f"Batch script generation finished for {len(reel_ids)} reels")
 
 
 def run_full_pipeline(reel_id: int, db_session_factory) -> None:
-    """Run full pipeline: TTS → lip-sync → post-processing (background task)."""
+    """
+    Run full pipeline: TTS → lip-sync → post-processing (background task).
+    Each stage is skipped when its stored artifact was produced from the
+    same inputs, so retries and overlay-only changes resume where they can.
+    Works on detached snapshots and writes each status change in its own
+    short transaction, so no DB connection is held during external calls.
+    """
+    reel, user = _load(db_session_factory, reel_id)
+    if not reel:
+        return
+
+    if not user or not user.is_onboarded:
+        _save(
+            db_session_factory, reel,
+            status="failed", error_message="User profile incomplete (photo or voice sample missing)",
+        )
+        return
+
+    # Step 1: TTS
+    _save(db_session_factory, reel, status="generating_audio")
+    try:
+        audio_fp = stage_fingerprint(
+            "audio", reel.script_text, file_sha256(user.voice_sample_path), reel.language, settings.TTS_BACKEND,
+        )
+        if _is_fresh(reel.audio_path, reel.audio_fingerprint, audio_fp):
+            logger.info(f"Reel {reel_id}: TTS inputs unchanged, reusing audio")
+        else:
+            with cpu_stage(settings.TTS_BACKEND == "local"):
+                audio_path = generate_tts_audio(reel.script_text, user.voice_sample_path, reel.language)
+            _save(db_session_factory, reel, audio_path=audio_path, audio_fingerprint=audio_fp)
+            logger.info(f"Reel {reel_id}: TTS audio generated")
+    except Exception as e:
+        logger.error(f"Reel {reel_id}: TTS failed: {e}")
+        _save(db_session_factory, reel, status="failed", error_message=f"TTS generation failed: {str(e)}")
+        return
+
+    # Step 2: Lip-sync
+    _save(db_session_factory, reel, status="generating_video")
+    try:
+        photo_path = _lipsync_photo(user)
+        video_raw_fp = stage_fingerprint(
+            "video_raw", file_sha256(photo_path), file_sha256(reel.audio_path),
+        )
+        if _is_fresh(reel.video_raw_path, reel.video_raw_fingerprint, video_raw_fp):
+            logger.info(f"Reel {reel_id}: lip-sync inputs unchanged, reusing raw video")
+        else:
+            video_raw_path = generate_lipsync_video(photo_path, reel.audio_path)
+            _save(db_session_factory, reel, video_raw_path=video_raw_path, video_raw_fingerprint=video_raw_fp)
+            logger.info(f"Reel {reel_id}: lip-sync video generated")
+    except Exception as e:
+        logger.error(f"Reel {reel_id}: lip-sync failed: {e}")
+        _save(db_session_factory, reel, status="failed", error_message=f"Lip-sync generation failed: {str(e)}")
+        return
+
+    # Step 3: Post-processing
+    _save(db_session_factory, reel, status="post_processing", progress_percent=0.0, eta_seconds=None)
+    try:
+        profile = reel.encode_profile or settings.DEFAULT_ENCODE_PROFILE
+        # Optionally publish a fast draft first and upgrade it in the background
+        draft_first = settings.DRAFT_FIRST_ENCODE and profile != "draft"
+        video_final_fp = _final_fingerprint(reel, user, profile)
+        draft_fp = _final_fingerprint(reel, user, "draft")
+
+        outputs = {}
+        if _is_fresh(reel.video_final_path, reel.video_final_fingerprint, video_final_fp):
+            logger.info(f"Reel {reel_id}: post-processing inputs unchanged, reusing final video")
+            draft_first = False
+        elif draft_first and _is_fresh(reel.video_final_path, reel.video_final_fingerprint, draft_fp):
+            logger.info(f"Reel {reel_id}: post-processing inputs unchanged, reusing draft video")
+        else:
+            encode_as = "draft" if draft_first else profile
+            with cpu_stage():
+                video_final_path, duration = post_process_video(
+                    reel.video_raw_path,
+                    user.full_name,
+                    reel.topic,
+                    profile=encode_as,
+                    on_progress=_progress_reporter(db_session_factory, reel),
+                )
+            outputs = {
+                "video_final_path": video_final_path,
+                "video_final_fingerprint": draft_fp if draft_first else video_final_fp,
+                "duration_seconds": duration,
+            }
+        _save(
+            db_session_factory, reel,
+            enqueue_kind="encode_upgrade" if draft_first else None,
+            status="completed", progress_percent=100.0, eta_seconds=None,
+            completed_at=datetime.now(timezone.utc), **outputs,
+        )
+        logger.info(f"Reel {reel_id}: pipeline completed successfully")
+    except Exception as e:
+        logger.error(f"Reel {reel_id}: post-processing failed: {e}")
+        _save(db_session_factory, reel, status="failed", error_message=f"Video post-processing failed: {str(e)}")
+    # Intermediates are only fetched again on a re-render
+    evict_local(reel.audio_path, reel.video_raw_path, reel.video_final_path)
+
+
+def run_encode_upgrade(reel_id: int, db_session_factory) -> None:
+    """Replace a published draft encode with the reel's target profile (background task)."""
+    reel, user = _load(db_session_factory, reel_id)
+    if not reel or reel.status != "completed":
+        return
+
+    profile = reel.encode_profile or settings.DEFAULT_ENCODE_PROFILE
+    draft_fp = _final_fingerprint(reel, user, "draft")
+    if reel.video_final_fingerprint != draft_fp:
+        return  # already upgraded or re-rendered since
+
+    with cpu_stage():
+        video_final_path, duration = post_process_video(
+            reel.video_raw_path, user.full_name, reel.topic, profile=profile,
+        )
+    evict_local(reel.video_raw_path, video_final_path)
+
+    draft_path = reel.video_final_path
+    fields = {
+        "video_final_path": video_final_path,
+        "video_final_fingerprint": _final_fingerprint(reel, user, profile),
+        "duration_seconds": duration,
+    }
+    with _session(db_session_factory) as db:
+        # Only swap if the reel still holds the draft we started from
+        updated = db.query(Reel).filter(
+            Reel.id == reel.id, Reel.video_final_fingerprint == draft_fp,
+        ).update(fields, synchronize_session=False)
+        db.commit()
+    if not updated:
+        # The reel changed while we were encoding; our output is stale
+        delete_file(video_final_path)
+        return
+
+    for name, value in fields.items():
+        setattr(reel, name, value)
+    publish_reel(reel)
+    delete_file(draft_path)
+    logger.info(f"Reel {reel_id}: draft upgraded to '{profile}' encode")
+
+
+@contextmanager
+def _session(db_session_factory):
     db = db_session_factory()
     try:
+        yield db
+    finally:
+        db.close()
+
+
+def _load(db_session_factory, reel_id: int):
+    """Detached snapshots of a reel and its owner; no connection is kept afterwards."""
+    with _session(db_session_factory) as db:
         reel = db.query(Reel).filter(Reel.id == reel_id).first()
         if not reel:
-            return
-
+            return None, None
         user = db.query(User).filter(User.id == reel.user_id).first()
-        if not user or not user.is_onboarded:
-            reel.status = "failed"
-            reel.error_message = "User profile incomplete (photo or voice sample missing)"
-            db.commit()
-            return
+        db.expunge_all()
+        return reel, user
 
-        # Step 1: TTS
-        reel.status = "generating_audio"
-        db.commit()
-        try:
-            audio_path = generate_tts_audio(reel.script_text, user.voice_sample_path, reel.language)
-            reel.audio_path = audio_path
-            db.commit()
-            logger.info(f"Reel {reel_id}: TTS audio generated")
-        except Exception as e:
-            logger.error(f"Reel {reel_id}: TTS failed: {e}")
-            reel.status = "failed"
-            reel.error_message = f"TTS generation failed: {str(e)}"
-            db.commit()
-            return
 
-        # Step 2: Lip-sync
-        reel.status = "generating_video"
+def _save(db_session_factory, reel: Reel, enqueue_kind: Optional[str] = None, **fields) -> None:
+    """
+    Write fields to the reel in one short transaction (optionally enqueueing
+    a follow-up job in it), mirror them on the snapshot and publish the change.
+    Stage outputs that are replaced are released; if the reel was deleted
+    meanwhile, the new outputs are released instead.
+    """
+    outputs = [name for name in OUTPUT_FIELDS if name in fields]
+    with _session(db_session_factory) as db:
+        updated = db.query(Reel).filter(Reel.id == reel.id).update(fields, synchronize_session=False)
+        if not updated:
+            db.rollback()
+            delete_outputs(*(fields[name] for name in outputs))
+            return
+        if enqueue_kind:
+            enqueue(db, enqueue_kind, reel.id)
         db.commit()
+    replaced = [getattr(reel, name) for name in outputs]
+    for name, value in fields.items():
+        setattr(reel, name, value)
+    publish_reel(reel)
+    delete_outputs(*replaced)
+
+
+def delete_outputs(*rel_paths: Optional[str]) -> None:
+    """Release stored stage outputs (audio, raw and final video) that nothing references anymore."""
+    for rel_path in rel_paths:
+        if not rel_path:
+            continue
         try:
-            video_raw_path = generate_lipsync_video(user.photo_path, reel.audio_path)
-            reel.video_raw_path = video_raw_path
-            db.commit()
-            logger.info(f"Reel {reel_id}: lip-sync video generated")
+            delete_file(rel_path)
         except Exception as e:
-            logger.error(f"Reel {reel_id}: lip-sync failed: {e}")
-            reel.status = "failed"
-            reel.error_message = f"Lip-sync generation failed: {str(e)}"
-            db.commit()
+            logger.warning(f"Could not delete {rel_path}: {e}")
+
+
+def _progress_reporter(db_session_factory, reel: Reel, min_interval_s: float = 2.0):
+    """Build an on_progress callback that writes encode progress to the reel, throttled."""
+    last_write = [0.0]
+
+    def report(percent: float, eta_seconds):
+        now = time.monotonic()
+        if now - last_write[0] < min_interval_s:
             return
+        last_write[0] = now
+        _save(db_session_factory, reel, progress_percent=percent, eta_seconds=eta_seconds)
 
-        # Step 3: Post-processing
-        reel.status = "post_processing"
-        db.commit()
-        try:
-            video_final_path, duration = post_process_video(
-                reel.video_raw_path,
-                user.full_name,
-                reel.topic,
-            )
-            reel.video_final_path = video_final_path
-            reel.duration_seconds = duration
-            reel.status = "completed"
-            reel.completed_at = datetime.now(timezone.utc)
-            db.commit()
-            logger.info(f"Reel {reel_id}: pipeline completed successfully")
-        except Exception as e:
-            logger.error(f"Reel {reel_id}: post-processing failed: {e}")
-            reel.status = "failed"
-            reel.error_message = f"Video post-processing failed: {str(e)}"
-            db.commit()
-    finally:
-        db.close()
+    return report
+
+
+def _lipsync_photo(user: User) -> str:
+    """The normalized photo when there is one (smaller upload, less GPU time), else the original."""
+    if file_exists(user.photo_normalized_path):
+        return user.photo_normalized_path
+    return user.photo_path
+
+
+def _final_fingerprint(reel: Reel, user: User, profile: str) -> str:
+    return stage_fingerprint(
+        "video_final", reel.video_raw_path, reel.video_raw_fingerprint,
+        user.full_name, reel.topic, overlay_fingerprint(), profile_fingerprint(profile),
+    )
+
+
+def stage_fingerprint(stage: str, *inputs) -> str:
+    """Stable hash of everything a stage's output depends on."""
+    digest = hashlib.sha256(stage.encode())
+    for value in inputs:
+        digest.update(b"\x00")
+        digest.update(str(value).encode())
+    return digest.hexdigest()
+
+
+def _is_fresh(rel_path, stored_fingerprint, fingerprint: str) -> bool:
+    return bool(rel_path) and stored_fingerprint == fingerprint and file_exists(rel_path)
+
+
+def run_speaker_conditioning(reel_id, db_session_factory, voice_sample_path: str) -> None:
+    """Precompute speaker latents for a freshly uploaded voice sample (background task)."""
+    with cpu_stage(settings.TTS_BACKEND == "local"):
+        prepare_speaker_conditioning(voice_sample_path)
+    logger.info(f"Speaker conditioning ready for {voice_sample_path}")
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Job, Reel
+from app.services.events_service import publish_reel
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+def enqueue(db: Session, kind: str, reel_id: Optional[int] = None, payload: Optional[dict] = None) -> Job:
+    """
+    Add a job to the queue. The job is only visible to workers once the
+    caller commits, so it can be enqueued in the same transaction as the
+    reel change that triggered it.
+    """
+    job = Job(
+        kind=kind,
+        reel_id=reel_id,
+        payload=json.dumps(payload) if payload else None,
+        status="queued",
+    )
+    db.add(job)
+    return job
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[Job]:
+    """
+    Lease the oldest queued job for this worker.
+    Postgres uses SELECT ... FOR UPDATE SKIP LOCKED so any number of workers
+    can poll concurrently; SQLite has no row locks, so claims are serialized
+    through a file lock instead.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return _claim(db, worker_id, skip_locked=True)
+
+    with _file_lock():
+        return _claim(db, worker_id, skip_locked=False)
+
+
+def heartbeat(db: Session, worker_id: str) -> int:
+    """Extend the lease on every job this worker is running. Returns the number of jobs touched."""
+    count = (
+        db.query(Job)
+        .filter(Job.status == "running", Job.locked_by == worker_id)
+        .update({Job.heartbeat_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    )
+    db.commit()
+    return count
+
+
+def requeue_expired(db: Session) -> int:
+    """
+    Recover jobs whose worker stopped heartbeating (crash, deploy, OOM).
+    Jobs with attempts left go back to the queue; the reel pipeline then
+    resumes from its last completed stage. Jobs out of attempts fail, and
+    so does their reel.
+    """
+    if db.bind.dialect.name == "postgresql":
+        return _requeue_expired(db, skip_locked=True)
+
+    with _file_lock():
+        return _requeue_expired(db, skip_locked=False)
+
+
+def complete(db: Session, job_id: int, worker_id: str, attempt: int) -> bool:
+    """Mark a job done if this worker still holds the lease from the given attempt."""
+    return _finish(db, job_id, worker_id, attempt, status="done")
+
+
+def fail(db: Session, job_id: int, worker_id: str, attempt: int, error: str) -> bool:
+    """Mark a job failed if this worker still holds the lease from the given attempt."""
+    return _finish(db, job_id, worker_id, attempt, status="failed", error_message=error)
+
+
+def get_payload(job: Job) -> dict:
+    return json.loads(job.payload) if job.payload else {}
+
+
+def _claim(db: Session, worker_id: str, skip_locked: bool) -> Optional[Job]:
+    query = db.query(Job).filter(Job.status == "queued").order_by(Job.id)
+    if skip_locked:
+        query = query.with_for_update(skip_locked=True)
+
+    job = query.first()
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.attempts = (job.attempts or 0) + 1
+    job.locked_by = worker_id
+    job.locked_at = datetime.now(timezone.utc)
+    job.heartbeat_at = job.locked_at
+    db.commit()
+    logger.info(f"Worker {worker_id} claimed job {job.id} ({job.kind}, reel {job.reel_id})")
+    return job
+
+
+def _finish(db: Session, job_id: int, worker_id: str, attempt: int, **fields) -> bool:
+    # A lease that expired and was claimed again belongs to the new owner; leave its row alone
+    updated = (
+        db.query(Job)
+        .filter(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id, Job.attempts == attempt)
+        .update({**fields, Job.finished_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    )
+    db.commit()
+    if not updated:
+        logger.warning(f"Job {job_id}: lease from attempt {attempt} lost by {worker_id}, not recording its outcome")
+    return bool(updated)
+
+
+def _requeue_expired(db: Session, skip_locked: bool) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_S)
+    query = db.query(Job).filter(Job.status == "running", Job.heartbeat_at < cutoff)
+    if skip_locked:
+        query = query.with_for_update(skip_locked=True)
+
+    jobs = query.all()
+    failed_reels = []
+    for job in jobs:
+        if (job.attempts or 0) < settings.JOB_MAX_ATTEMPTS:
+            logger.warning(f"Job {job.id} lease expired on {job.locked_by}, requeueing (attempt {job.attempts})")
+            job.status = "queued"
+            job.locked_by = None
+            job.locked_at = None
+            job.heartbeat_at = None
+            continue
+
+        logger.error(f"Job {job.id} lease expired on {job.locked_by}, giving up after {job.attempts} attempts")
+        job.status = "failed"
+        job.error_message = "Worker lost too many times"
+        job.finished_at = datetime.now(timezone.utc)
+        for reel in _unfinished_reels(db, job):
+            reel.status = "failed"
+            reel.error_message = f"Processing was interrupted {job.attempts} times, please retry"
+            failed_reels.append(reel)
+    db.commit()
+    for reel in failed_reels:
+        publish_reel(reel)
+    return len(jobs)
+
+
+def _unfinished_reels(db: Session, job: Job) -> list:
+    """Reels a job was still working on: its own, or the batch reels still waiting for a script."""
+    if job.reel_id:
+        reel = db.query(Reel).filter(Reel.id == job.reel_id).first()
+        return [reel] if reel and reel.status not in ("completed", "failed") else []
+
+    reel_ids = get_payload(job).get("reel_ids")
+    if not reel_ids:
+        return []
+    return db.query(Reel).filter(Reel.id.in_(reel_ids), Reel.status.in_(("pending", "generating_script"))).all()
+
+
+@contextmanager
+def _file_lock():
+    if fcntl is None:
+        yield
+        return
+
+    lock_path = os.path.join(settings.STORAGE_PATH, ".jobs.lock")
+    os.makedirs(settings.STORAGE_PATH, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
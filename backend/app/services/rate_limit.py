@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every caller in the process. Callers reserve a
+    token and are told how long to wait for it, so concurrent callers are
+    spaced out instead of retrying in lockstep. A provider's Retry-After
+    pauses the whole bucket.
+    """
+
+    def __init__(self, rate_per_min: float, burst: int):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets a single trial call through once reset_s has passed."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_s: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_s or self._trial_in_flight:
+                raise CircuitOpenError(f"{self.name} is unavailable, try again later")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.error(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+
+class ProviderGuard:
+    """Rate limiting, Retry-After handling and circuit breaking for one provider/model."""
+
+    def __init__(self, name: str, rate_per_min: float, burst: int):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_min, burst)
+        self.breaker = CircuitBreaker(name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_S)
+        self.max_retries = settings.RATE_LIMIT_MAX_RETRIES
+
+    async def acall(self, fn, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            await asyncio.sleep(self.bucket.reserve())
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not self._handle_error(e, attempt):
+                    raise
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _handle_error(self, exc: Exception, attempt: int) -> bool:
+        """Record the failure; returns True if the call should be retried."""
+        status_code = getattr(exc, "status_code", None)
+        if status_code == 429:
+            # The provider is up, just busy: back off without tripping the breaker
+            self.breaker.record_success()
+            wait = _retry_after(exc) or 15 * (attempt + 1)
+            self.bucket.pause(wait)
+            if attempt < self.max_retries:
+                logger.warning(f"{self.name} rate limited, retrying in {wait:.1f}s (attempt {attempt + 1})")
+                return True
+            return False
+
+        if _is_outage(exc) or (status_code or 0) >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return False
+
+
+def _is_outage(exc: Exception) -> bool:
+    # Groq's SDK wraps transport failures in its own APIConnectionError/APITimeoutError
+    return isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)) or type(exc).__name__ in (
+        "APIConnectionError", "APITimeoutError",
+    )
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None:
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except ValueError:
+        return None
+
+
+_guards: dict = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(provider: str, model: str = "") -> ProviderGuard:
+    """Guard shared by all callers of the given provider/model in this process."""
+    name = f"{provider}:{model}" if model else provider
+    with _guards_lock:
+        if name not in _guards:
+            if model:
+                rate_per_min = {
+                    "replicate": settings.REPLICATE_RATE_PER_MIN,
+                    "groq": settings.GROQ_RATE_PER_MIN,
+                }.get(provider, 60)
+            else:
+                # Provider-wide guard for calls outside any model's budget
+                rate_per_min = {"replicate": settings.REPLICATE_API_RATE_PER_MIN}.get(provider, 60)
+            _guards[name] = ProviderGuard(name, rate_per_min, settings.RATE_LIMIT_BURST)
+        return _guards[name]
@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import threading
+import time
+from typing import Optional
+
+import httpx
+
+from app.services.rate_limit import get_guard
+from app.utils.aio import get_loop, run_sync
+from app.utils.download import download_file
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled")
+WEBHOOK_TOLERANCE_S = 300  # reject signed deliveries older than this (replays)
+
+
+class ReplicateError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(f"{status_code}: {message}" if status_code else message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class ReplicateClient:
+    """
+    Minimal async client for the Replicate HTTP API.
+
+    Predictions are submitted and then awaited by polling, or by a completion
+    webhook when REPLICATE_WEBHOOK_URL is set, so waiting costs no thread.
+    All requests, output downloads included, share one pooled
+    httpx.AsyncClient on the process event loop.
+    """
+
+    def __init__(self, base_url: str, api_token: str, webhook_url: str = ""):
+        self.base_url = base_url.rstrip("/")
+        self.api_token = api_token
+        self.webhook_url = webhook_url
+        self._http: Optional[httpx.AsyncClient] = None
+        self._waiters: dict = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(60, connect=10),
+                limits=httpx.Limits(max_connections=settings.REPLICATE_MAX_CONNECTIONS),
+            )
+        return self._http
+
+    async def run(self, model: str, input: dict, files: Optional[dict] = None):
+        """
+        Run a model ("owner/name:version") to completion and return its output.
+        files maps input names to local paths that are uploaded first.
+        """
+        input = dict(input)
+        for name, path in (files or {}).items():
+            input[name] = await get_guard("replicate").acall(self.upload_file, path)
+
+        guard = get_guard("replicate", model.split(":", 1)[0])
+        prediction = await guard.acall(self.create_prediction, model.split(":", 1)[-1], input)
+        prediction = await self.wait(prediction)
+        if prediction["status"] != "succeeded":
+            raise ReplicateError(f"Prediction {prediction['id']} {prediction['status']}: {prediction.get('error')}")
+        return prediction["output"]
+
+    async def download(self, url: str, dest_path: str, timeout: float) -> int:
+        """Stream a prediction output to dest_path over the shared connection pool."""
+        return await download_file(url, dest_path, timeout=timeout, client=self.http)
+
+    async def upload_file(self, path: str) -> str:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            response = await self.http.post(
+                "/files", files={"content": (os.path.basename(path), f, content_type)}, headers=self._auth,
+            )
+        self._raise_for_status(response)
+        return response.json()["urls"]["get"]
+
+    async def create_prediction(self, version: str, input: dict) -> dict:
+        body = {"version": version, "input": input}
+        if self.webhook_url:
+            body["webhook"] = self.webhook_url
+            body["webhook_events_filter"] = ["completed"]
+        response = await self.http.post("/predictions", json=body, headers=self._auth)
+        self._raise_for_status(response)
+        prediction = response.json()
+        logger.info(f"Replicate prediction {prediction['id']} created ({prediction['status']})")
+        return prediction
+
+    async def get_prediction(self, prediction_id: str) -> dict:
+        response = await self.http.get(f"/predictions/{prediction_id}", headers=self._auth)
+        self._raise_for_status(response)
+        return response.json()
+
+    async def wait(self, prediction: dict) -> dict:
+        started = time.monotonic()
+        # With a webhook we only poll as a safety net for lost deliveries
+        interval = settings.REPLICATE_POLL_INTERVAL_S * (10 if self.webhook_url else 1)
+        while prediction["status"] not in TERMINAL_STATUSES:
+            if time.monotonic() - started > settings.REPLICATE_PREDICTION_TIMEOUT_S:
+                raise ReplicateError(f"Prediction {prediction['id']} timed out")
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[prediction["id"]] = waiter
+            try:
+                prediction = await asyncio.wait_for(waiter, timeout=interval)
+            except asyncio.TimeoutError:
+                # Polls and uploads share the provider-wide guard, not the model's prediction budget
+                prediction = await get_guard("replicate").acall(self.get_prediction, prediction["id"])
+            finally:
+                self._waiters.pop(prediction["id"], None)
+        logger.info(f"Replicate prediction {prediction['id']} {prediction['status']} after {time.monotonic() - started:.0f}s")
+        return prediction
+
+    def deliver_webhook(self, prediction: dict) -> bool:
+        """Hand a verified webhook payload to the coroutine waiting on it. Thread-safe."""
+        if not self.webhook_url:
+            return False  # this client never asked for webhooks
+
+        def _resolve():
+            waiter = self._waiters.get(prediction.get("id"))
+            if waiter and not waiter.done():
+                waiter.set_result(prediction)
+
+        if prediction.get("id") not in self._waiters:
+            return False
+        get_loop().call_soon_threadsafe(_resolve)
+        return True
+
+    @property
+    def _auth(self) -> dict:
+        # Per request rather than on the client, so downloads from other hosts never carry the token
+        return {"Authorization": f"Bearer {self.api_token}"} if self.api_token else {}
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> None:
+        if response.is_success:
+            return
+        retry_after = response.headers.get("retry-after")
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise ReplicateError(
+            detail,
+            status_code=response.status_code,
+            retry_after=float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None,
+        )
+
+
+def webhooks_enabled() -> bool:
+    """Webhooks are only used when deliveries can be authenticated."""
+    return bool(settings.REPLICATE_WEBHOOK_URL and settings.REPLICATE_WEBHOOK_SECRET)
+
+
+def verify_webhook(body: bytes, headers) -> bool:
+    """Check a Replicate webhook signature against REPLICATE_WEBHOOK_SECRET; unsigned setups verify nothing."""
+    if not settings.REPLICATE_WEBHOOK_SECRET:
+        return False
+    msg_id = headers.get("webhook-id", "")
+    timestamp = headers.get("webhook-timestamp", "")
+    signatures = headers.get("webhook-signature", "")
+    if not (msg_id and timestamp.isdigit() and signatures):
+        return False
+    if abs(time.time() - int(timestamp)) > WEBHOOK_TOLERANCE_S:
+        return False
+
+    secret = base64.b64decode(settings.REPLICATE_WEBHOOK_SECRET.split("_", 1)[-1])
+    signed = f"{msg_id}.{timestamp}.".encode() + body
+    expected = base64.b64encode(hmac.new(secret, signed, hashlib.sha256).digest()).decode()
+    return any(
+        hmac.compare_digest(expected, sig.split(",", 1)[-1])
+        for sig in signatures.split()
+    )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ReplicateClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.REPLICATE_WEBHOOK_URL and not settings.REPLICATE_WEBHOOK_SECRET:
+                    logger.warning("REPLICATE_WEBHOOK_URL is set without REPLICATE_WEBHOOK_SECRET; polling instead")
+                _client = ReplicateClient(
+                    settings.REPLICATE_API_BASE,
+                    settings.REPLICATE_API_TOKEN,
+                    settings.REPLICATE_WEBHOOK_URL if webhooks_enabled() else "",
+                )
+    return _client
+
+
+def run_prediction(model: str, input: dict, files: Optional[dict] = None):
+    """Blocking wrapper for pipeline code running in worker threads."""
+    return run_sync(get_client().run(model, input, files))
+
+
+def download_output(url: str, dest_path: str, timeout: float = 120) -> int:
+    """Blocking wrapper that downloads a prediction output through the shared client."""
+    return run_sync(get_client().download(url, dest_path, timeout))
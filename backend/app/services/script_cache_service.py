@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import ScriptCache
+from app.services.script_service import generate_script, PROMPT_VERSION, SCRIPT_MODEL
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Fold case, punctuation and spacing so near-identical topics share a key.
+    Works on category rather than \\w so Devanagari vowel signs survive.
+    """
+    text = unicodedata.normalize("NFKC", topic).casefold()
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(topic: str, language: str) -> str:
+    raw = f"{PROMPT_VERSION}|{SCRIPT_MODEL}|{language}|{normalize_topic(topic)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get_or_generate_script(
+    db: Session, topic: str, language: str, user_id: int, fresh: bool = False, on_delta=None,
+) -> str:
+    """
+    Return a cached script for this topic/language, generating one on a miss.
+    Users are spread over SCRIPT_CACHE_VARIANTS variants per key so doctors
+    with the same topic don't all publish identical scripts.
+    fresh=True skips the cache entirely. on_delta is passed to generate_script.
+    """
+    if fresh or not settings.SCRIPT_CACHE_ENABLED:
+        _count("bypassed")
+        return generate_script(topic, language, on_delta)
+
+    key = cache_key(topic, language)
+    variant = user_id % max(1, settings.SCRIPT_CACHE_VARIANTS)
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=settings.SCRIPT_CACHE_TTL_HOURS)
+
+    entry = db.query(ScriptCache).filter(ScriptCache.cache_key == key, ScriptCache.variant == variant).first()
+    if entry and _as_utc(entry.created_at) >= cutoff:
+        entry.hits = (entry.hits or 0) + 1
+        entry.last_used_at = now
+        db.commit()
+        _count("hits")
+        logger.info(f"Script cache hit for topic '{topic}' ({language}, variant {variant})")
+        return entry.script_text
+
+    _count("misses")
+    expired_id = entry.id if entry else None
+    # End the read transaction so no pooled connection is held while the LLM streams
+    db.commit()
+    script = generate_script(topic, language, on_delta)
+
+    now = datetime.now(timezone.utc)
+    # An expired entry still owns the key/variant slot, so refresh it in place
+    refreshed = expired_id and db.query(ScriptCache).filter(ScriptCache.id == expired_id).update(
+        {"script_text": script, "created_at": now, "last_used_at": now, "hits": 0},
+        synchronize_session=False,
+    )
+    if not refreshed:
+        db.add(ScriptCache(
+            cache_key=key,
+            normalized_topic=normalize_topic(topic),
+            language=language,
+            prompt_version=PROMPT_VERSION,
+            variant=variant,
+            script_text=script,
+        ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker cached this key/variant first; ours is just as good
+        db.rollback()
+    _evict(db, cutoff)
+    return script
+
+
+def stats() -> dict:
+    """This process's lookup counters; workers report them with their heartbeat."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+    return stats
+
+
+def summary(db: Session) -> dict:
+    """Cache-wide totals from the table itself, which survive worker restarts."""
+    entries, hits = db.query(func.count(ScriptCache.id), func.coalesce(func.sum(ScriptCache.hits), 0)).one()
+    return {"entries": entries, "hits": hits}
+
+
+def _evict(db: Session, cutoff: datetime) -> None:
+    """Drop expired entries, then the least recently used beyond SCRIPT_CACHE_MAX_ENTRIES."""
+    db.query(ScriptCache).filter(ScriptCache.created_at < cutoff).delete(synchronize_session=False)
+    overflow = db.query(ScriptCache).count() - settings.SCRIPT_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = [
+            row.id for row in
+            db.query(ScriptCache.id).order_by(ScriptCache.last_used_at).limit(overflow).all()
+        ]
+        db.query(ScriptCache).filter(ScriptCache.id.in_(stale_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes for values we stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
@@ -1,11 +1,26 @@
+import asyncio
 import logging
-from groq import Groq
+import threading
+import time
+from typing import Callable, Optional
 
+from groq import AsyncGroq
+
+from app.services.rate_limit import get_guard
+from app.utils.aio import run_sync
 from config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+SCRIPT_MODEL = "llama-3.3-70b-versatile"
+
+# Minimum interval between partial-script updates pushed to clients
+STREAM_FLUSH_S = 0.25
+
+# Bump whenever SYSTEM_PROMPTS or generation parameters change so cached scripts are not reused
+PROMPT_VERSION = "1"
+
 SYSTEM_PROMPTS = {
     "en": """You are a medical content scriptwriter for Indian doctors creating Instagram Reels.
 Write a concise, engaging script (80-120 words) for a 30-60 second reel.
@@ -35,23 +50,60 @@ Guidelines:
 }
 
 
-def generate_script(topic: str, language: str = "en") -> str:
-    """Generate a reel script using Groq API (Llama 3.3 70B)."""
-    client = Groq(api_key=settings.GROQ_API_KEY)
+_client = None
+_client_lock = threading.Lock()
+
 
+def _get_client() -> AsyncGroq:
+    """One async Groq client (and connection pool) shared by all script generations."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Retries are handled by the shared provider guard, not the SDK
+                _client = AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+    return _client
+
+
+def generate_script(
+    topic: str, language: str = "en", on_delta: Optional[Callable[[str], None]] = None,
+) -> str:
+    """
+    Generate a reel script using Groq API (Llama 3.3 70B).
+    Tokens are streamed; on_delta(text_so_far) is called from a worker thread
+    at most every STREAM_FLUSH_S while the script is being written.
+    """
+    return run_sync(_stream_script(topic, language, on_delta))
+
+
+async def _stream_script(topic: str, language: str, on_delta) -> str:
     system_prompt = SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS["en"])
 
-    chat_completion = client.chat.completions.create(
+    stream = await get_guard("groq", SCRIPT_MODEL).acall(
+        _get_client().chat.completions.create,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": f"Write a reel script about: {topic}"},
         ],
-        model="llama-3.3-70b-versatile",
+        model=SCRIPT_MODEL,
         temperature=0.7,
         max_tokens=300,
+        stream=True,
     )
 
-    script = chat_completion.choices[0].message.content.strip()
+    parts = []
+    last_flush = time.monotonic()
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        parts.append(delta)
+        if on_delta and time.monotonic() - last_flush >= STREAM_FLUSH_S:
+            last_flush = time.monotonic()
+            # Callbacks may touch the DB; keep them off the event loop
+            await asyncio.to_thread(on_delta, "".join(parts))
+
+    script = "".join(parts).strip()
     # Remove any quotes wrapping the script
     if script.startswith('"') and script.endswith('"'):
         script = script[1:-1]
@@ -0,0 +1,254 @@
+import logging
+import mimetypes
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Iterator, Optional
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Top-level directories that hold objects' keys; scratch files live elsewhere
+CACHED_DIRS = ("uploads", "generated", "objects")
+# Cached copies used this recently may still be open in a tool (or being
+# written by another process) and are never evicted
+CACHE_MIN_AGE_S = 900
+
+
+class LocalBackend:
+    """
+    Objects are plain files under a root directory, served by the /storage
+    static mount. Only works when web and workers share that filesystem.
+    """
+
+    is_remote = False
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def put_file(self, src_path: str, key: str) -> None:
+        """Move a finished local file into storage under key."""
+        dest = self.local_path(key)
+        if os.path.abspath(src_path) == os.path.abspath(dest):
+            return
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        # An atomic rename when src is under the root, a copy otherwise
+        shutil.move(src_path, dest)
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def stream(self, key: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.local_path(key), "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.local_path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.local_path(key))
+
+    def delete(self, key: str) -> None:
+        path = self.local_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def presign(self, key: str, expires_s: int, download_name: Optional[str] = None) -> str:
+        # The static mount is unauthenticated, so there is nothing to sign
+        return f"/storage/{key}"
+
+    def evict(self, key: str) -> None:
+        pass  # the local copy is the object itself
+
+
+class S3Backend:
+    """
+    Objects live in an S3-compatible bucket (AWS, MinIO, ...). Large files
+    are uploaded and downloaded in parallel multipart chunks; reads for
+    tools that need a file (FFmpeg, TTS, Replicate uploads) go through a
+    local cache under cache_root that mirrors the keys. The cache is kept
+    under cache_max_mb by removing the least recently used copies.
+    """
+
+    is_remote = True
+
+    def __init__(self, bucket: str, cache_root: str, prefix: str = "", cache_max_mb: int = 2048):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.cache_root = cache_root
+        self.prefix = prefix.strip("/")
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        # Bytes cached since the last trim; starts full so the first write trims leftovers
+        self._untrimmed_bytes = self.cache_max_bytes
+        self._trim_lock = threading.Lock()
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            config=Config(signature_version="s3v4", max_pool_connections=settings.S3_MAX_CONNECTIONS),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+        )
+
+    def put_file(self, src_path: str, key: str) -> None:
+        """Upload a finished local file under key; it is kept as the cached copy."""
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_file(
+            src_path, self.bucket, self._object_key(key),
+            ExtraArgs={"ContentType": content_type}, Config=self.transfer_config,
+        )
+        cached = self._cache_path(key)
+        if os.path.abspath(src_path) != os.path.abspath(cached):
+            os.makedirs(os.path.dirname(cached), exist_ok=True)
+            shutil.move(src_path, cached)
+        os.utime(cached)
+        self._cached(os.path.getsize(cached))
+
+    def local_path(self, key: str) -> str:
+        """Path of a local copy of the object, downloaded on first use."""
+        cached = self._cache_path(key)
+        try:
+            # The modification time doubles as the last-use time for eviction
+            os.utime(cached)
+            return cached
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp_path = f"{cached}.{uuid.uuid4().hex}.part"
+        try:
+            self.client.download_file(self.bucket, self._object_key(key), tmp_path, Config=self.transfer_config)
+            os.replace(tmp_path, cached)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._cached(os.path.getsize(cached))
+        return cached
+
+    def stream(self, key: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            raise FileNotFoundError(key)
+        return head["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        self.evict(key)
+
+    def presign(self, key: str, expires_s: int, download_name: Optional[str] = None) -> str:
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if download_name:
+            params["ResponseContentDisposition"] = f'attachment; filename="{download_name}"'
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires_s)
+
+    def evict(self, key: str) -> None:
+        cached = self._cache_path(key)
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def trim_cache(self) -> int:
+        """Remove least recently used cached copies until the cache fits; returns bytes freed."""
+        entries = []
+        for top in CACHED_DIRS:
+            for dirpath, _, filenames in os.walk(os.path.join(self.cache_root, top)):
+                for name in filenames:
+                    # Partial downloads and TTS latents are managed by their writers
+                    if name.endswith((".part", ".latents.pt")):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        cutoff = time.time() - CACHE_MIN_AGE_S
+        for mtime, size, path in sorted(entries):
+            if total - freed <= self.cache_max_bytes or mtime > cutoff:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+        if freed:
+            logger.info(f"Evicted {freed} bytes of cached objects ({total - freed} bytes kept)")
+        return freed
+
+    def _cached(self, size: int) -> None:
+        """Account for a new cached copy, trimming once a tenth of the limit has been added."""
+        with self._trim_lock:
+            self._untrimmed_bytes += size
+            if self._untrimmed_bytes < self.cache_max_bytes // 10:
+                return
+            self._untrimmed_bytes = 0
+        try:
+            self.trim_cache()
+        except OSError as e:
+            logger.warning(f"Could not trim the object cache: {e}")
+
+    def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def _object_key(self, key: str) -> str:
+        key = key.replace(os.sep, "/")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_root, key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.STORAGE_BACKEND == "s3":
+                    if not settings.S3_BUCKET:
+                        raise RuntimeError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+                    _backend = S3Backend(
+                        settings.S3_BUCKET, settings.STORAGE_PATH, settings.S3_PREFIX, settings.S3_CACHE_MAX_MB,
+                    )
+                    logger.info(f"Storing files in s3://{settings.S3_BUCKET}/{settings.S3_PREFIX}")
+                elif settings.STORAGE_BACKEND == "local":
+                    _backend = LocalBackend(settings.STORAGE_PATH)
+                else:
+                    raise RuntimeError(f"Unknown STORAGE_BACKEND '{settings.STORAGE_BACKEND}'")
+    return _backend
@@ -1,35 +1,248 @@
+import hashlib
+import logging
 import os
+import tempfile
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO, Optional
 
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models import StoredObject
+from app.services.storage_backends import get_backend
 from config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+STAGING_DIR = "tmp/uploads"
+CONTENT_DIR = "objects"
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class StagedUpload:
+    """An upload copied to a temp file under STORAGE_PATH, not yet in its final place."""
+    path: str  # absolute
+    filename: str
+    size: int
+    sha256: str
 
 
 def get_storage_path(*parts: str) -> str:
+    """
+    Local path to write a new file to before put_file(). With the local
+    backend this is already its final place, so put_file() is a no-op.
+    """
     path = os.path.join(settings.STORAGE_PATH, *parts)
     os.makedirs(os.path.dirname(path), exist_ok=True)
     return path
 
 
-def save_upload(file_bytes: bytes, subdir: str, filename: str) -> str:
-    """Save uploaded file and return relative path from storage root."""
-    ext = Path(filename).suffix
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    rel_path = os.path.join(subdir, unique_name)
-    abs_path = get_storage_path(rel_path)
-    os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-    with open(abs_path, "wb") as f:
-        f.write(file_bytes)
+def unique_rel_path(subdir: str, filename: str) -> str:
+    """A fresh relative path in subdir keeping filename's extension."""
+    return os.path.join(subdir, f"{uuid.uuid4().hex}{Path(filename).suffix}")
+
+
+def stage_upload(src: BinaryIO, filename: str, max_bytes: int) -> StagedUpload:
+    """
+    Copy an upload in chunks to a temp file under STORAGE_PATH, hashing as it
+    goes. Raises UploadTooLargeError as soon as more than max_bytes arrive.
+    Only one chunk is held in memory at a time.
+    """
+    staging_dir = os.path.join(settings.STORAGE_PATH, STAGING_DIR)
+    os.makedirs(staging_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=staging_dir, suffix=Path(filename).suffix)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: src.read(UPLOAD_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    logger.info(f"Staged upload {filename}: {size} bytes, sha256 {digest.hexdigest()[:12]}")
+    return StagedUpload(path=tmp_path, filename=filename, size=size, sha256=digest.hexdigest())
+
+
+def save_staged(staged: StagedUpload, subdir: str) -> str:
+    """Move a staged upload into subdir under a unique name and return its relative path."""
+    if settings.STORAGE_CONTENT_ADDRESSED:
+        # Hashed while streaming, so no second read is needed
+        return _place_object(staged.path, staged.sha256, staged.size, Path(staged.filename).suffix)
+
+    rel_path = unique_rel_path(subdir, staged.filename)
+    # Locally this is an atomic rename out of the staging dir
+    get_backend().put_file(staged.path, rel_path)
+    return rel_path
+
+
+def discard_staged(staged: StagedUpload) -> None:
+    if os.path.exists(staged.path):
+        os.remove(staged.path)
+
+
+def put_file(src_path: str, rel_path: str) -> str:
+    """
+    Store a finished local file under rel_path (or under its content hash
+    when STORAGE_CONTENT_ADDRESSED is on) and return the path it is stored
+    under. src_path is consumed.
+    """
+    if settings.STORAGE_CONTENT_ADDRESSED:
+        return _place_object(src_path, _local_sha256(src_path), os.path.getsize(src_path), Path(rel_path).suffix)
+
+    get_backend().put_file(src_path, rel_path)
     return rel_path
 
 
+def local_path(rel_path: str) -> str:
+    """Path of a local copy of a stored file, for tools that need one; remote files are downloaded once."""
+    return get_backend().local_path(rel_path)
+
+
+def file_exists(rel_path: Optional[str]) -> bool:
+    return bool(rel_path) and get_backend().exists(rel_path)
+
+
+def file_size(rel_path: str) -> int:
+    return get_backend().size(rel_path)
+
+
+def presign_url(rel_path: str, download_name: Optional[str] = None) -> str:
+    """URL a browser can fetch the file from: the static mount locally, a signed URL otherwise."""
+    return get_backend().presign(rel_path, settings.STORAGE_URL_EXPIRY_S, download_name)
+
+
+def is_remote_storage() -> bool:
+    return get_backend().is_remote
+
+
+def evict_local(*rel_paths: Optional[str]) -> None:
+    """Drop cached local copies of remotely stored files; the local backend keeps its files."""
+    for rel_path in rel_paths:
+        if rel_path:
+            get_backend().evict(rel_path)
+
+
 def delete_file(rel_path: str) -> None:
-    abs_path = os.path.join(settings.STORAGE_PATH, rel_path)
-    if os.path.exists(abs_path):
-        os.remove(abs_path)
+    """Delete a stored file; content-addressed files are only removed with their last reference."""
+    if is_content_addressed(rel_path):
+        release(rel_path)
+        return
+
+    get_backend().delete(rel_path)
+
+
+def file_sha256(rel_path: str) -> str:
+    """Hex SHA-256 of a stored file's contents."""
+    if is_content_addressed(rel_path):
+        return Path(rel_path).name.split(".", 1)[0]
+
+    # Stages hash the inputs they are about to use, so this fills the local cache once
+    return _local_sha256(local_path(rel_path))
+
+
+def content_path(sha256: str, ext: str = "") -> str:
+    """Relative path of a blob in the content-addressed layout, sharded by hash prefix."""
+    return os.path.join(CONTENT_DIR, sha256[:2], sha256[2:4], f"{sha256}{ext.lower()}")
+
+
+def is_content_addressed(rel_path: Optional[str]) -> bool:
+    return bool(rel_path) and Path(rel_path).parts[0] == CONTENT_DIR
+
+
+def find_object(sha256: str, ext: str = "") -> Optional[str]:
+    """Relative path of already-stored content with this hash, without reading any file."""
+    rel_path = content_path(sha256, ext)
+    return rel_path if get_backend().exists(rel_path) else None
+
+
+def intern_file(rel_path: Optional[str]) -> Optional[str]:
+    """
+    Move a freshly written file into the content-addressed layout and return
+    its new path, or return the path unchanged when the layout is disabled.
+    Identical content is stored once; the duplicate is deleted.
+    """
+    if not settings.STORAGE_CONTENT_ADDRESSED or not rel_path or is_content_addressed(rel_path):
+        return rel_path
+    new_path = put_file(local_path(rel_path), rel_path)
+    # Locally the file was moved; a remote backend still has the old object
+    get_backend().delete(rel_path)
+    return new_path
+
+
+def retain(rel_path: str) -> None:
+    """Record one more reference to an already-stored content-addressed file."""
+    _add_ref(rel_path, file_sha256(rel_path), file_size(rel_path))
+
+
+def release(rel_path: str) -> None:
+    """Drop one reference to a content-addressed file, deleting it with the last one."""
+    db = SessionLocal()
+    try:
+        db.query(StoredObject).filter(StoredObject.rel_path == rel_path).update(
+            {StoredObject.refcount: StoredObject.refcount - 1}, synchronize_session=False,
+        )
+        obj = db.query(StoredObject).filter(StoredObject.rel_path == rel_path).first()
+        if obj is None:
+            logger.warning(f"No reference count for {rel_path}; keeping the file")
+        elif obj.refcount <= 0:
+            db.delete(obj)
+            # Removed before commit, while the row is locked, so a concurrent
+            # _add_ref waits and then finds the file gone and puts it back
+            get_backend().delete(rel_path)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _place_object(src_abs_path: str, sha256: str, size: int, ext: str) -> str:
+    rel_path = content_path(sha256, ext)
+    # Count the reference first so a concurrent release can't delete the blob under us
+    _add_ref(rel_path, sha256, size)
+    if get_backend().exists(rel_path):
+        os.remove(src_abs_path)
+        logger.info(f"Deduplicated {size} bytes into {rel_path}")
+    else:
+        get_backend().put_file(src_abs_path, rel_path)
+    return rel_path
+
+
+def _add_ref(rel_path: str, sha256: str, size: int) -> None:
+    db = SessionLocal()
+    try:
+        for _ in range(2):
+            updated = db.query(StoredObject).filter(StoredObject.rel_path == rel_path).update(
+                {StoredObject.refcount: StoredObject.refcount + 1}, synchronize_session=False,
+            )
+            if not updated:
+                db.add(StoredObject(rel_path=rel_path, sha256=sha256, size=size, refcount=1))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another writer created the row first; count ours on it
+                db.rollback()
+        raise RuntimeError(f"Could not record a reference to {rel_path}")
+    finally:
+        db.close()
 
 
-def get_absolute_path(rel_path: str) -> str:
-    return os.path.join(settings.STORAGE_PATH, rel_path)
+def _local_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,213 @@
+import glob
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+XTTS_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+
+
+@dataclass
+class _SynthesisRequest:
+    text: str
+    speaker_wav: str
+    language: str
+    output_path: str
+    conditioning_path: str = None
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class XTTSEngine:
+    """
+    Process-wide XTTS v2 engine.
+
+    The model is loaded once and kept resident. Synthesis requests from any
+    thread go through a single queue; the engine thread drains it in
+    micro-batches and computes speaker conditioning once per speaker in a
+    batch instead of once per request.
+    """
+
+    def __init__(self, batch_max: int, batch_window_s: float):
+        self.batch_max = batch_max
+        self.batch_window_s = batch_window_s
+        self._tts = None
+        self._load_lock = threading.Lock()
+        self._queue: "queue.Queue[_SynthesisRequest]" = queue.Queue()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "load_time_s": None,
+            "requests": 0,
+            "batches": 0,
+            "queue_wait_s_total": 0.0,
+            "queue_wait_s_max": 0.0,
+            "synthesis_s_total": 0.0,
+        }
+
+    @property
+    def loaded(self) -> bool:
+        return self._tts is not None
+
+    def load(self):
+        """Load the model if needed. Raises ImportError if Coqui TTS is missing."""
+        if self._tts is not None:
+            return self._tts
+        with self._load_lock:
+            if self._tts is None:
+                from TTS.api import TTS
+
+                started = time.monotonic()
+                self._tts = TTS(XTTS_MODEL_NAME, gpu=False)
+                load_time = time.monotonic() - started
+                with self._stats_lock:
+                    self._stats["load_time_s"] = round(load_time, 2)
+                logger.info(f"XTTS model loaded in {load_time:.1f}s")
+        return self._tts
+
+    def synthesize(
+        self, text: str, speaker_wav: str, language: str, output_path: str, conditioning_path: str = None,
+    ) -> None:
+        """
+        Queue a synthesis request and block until its WAV is written.
+        If conditioning_path points at precomputed speaker latents they are
+        used instead of re-deriving them from speaker_wav.
+        """
+        self.load()
+        self._ensure_thread()
+        request = _SynthesisRequest(text, speaker_wav, language, output_path, conditioning_path)
+        self._queue.put(request)
+        request.future.result()
+
+    def compute_conditioning(self, speaker_wav: str, conditioning_path: str) -> None:
+        """Derive speaker latents from a voice sample and persist them."""
+        import torch
+
+        model = self.load().synthesizer.tts_model
+        started = time.monotonic()
+        latents = model.get_conditioning_latents(audio_path=[speaker_wav])
+        tmp_path = f"{conditioning_path}.tmp"
+        torch.save(latents, tmp_path)
+        os.replace(tmp_path, conditioning_path)
+        logger.info(f"Speaker conditioning computed in {time.monotonic() - started:.1f}s: {conditioning_path}")
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        requests = stats["requests"] or 1
+        stats["loaded"] = self.loaded
+        stats["queue_depth"] = self._queue.qsize()
+        stats["queue_wait_s_avg"] = round(stats["queue_wait_s_total"] / requests, 3)
+        stats["synthesis_s_avg"] = round(stats["synthesis_s_total"] / requests, 3)
+        return stats
+
+    def _ensure_thread(self) -> None:
+        with self._load_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="xtts-engine", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window_s
+            while len(batch) < self.batch_max:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list) -> None:
+        started = time.monotonic()
+        waits = [started - r.enqueued_at for r in batch]
+
+        by_speaker: dict = {}
+        for request in batch:
+            by_speaker.setdefault(request.speaker_wav, []).append(request)
+
+        for speaker_wav, requests in by_speaker.items():
+            try:
+                latents = self._load_conditioning(speaker_wav, requests[0].conditioning_path)
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            for request in requests:
+                try:
+                    self._synthesize_one(request, latents)
+                    request.future.set_result(request.output_path)
+                except Exception as e:
+                    request.future.set_exception(e)
+
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self._stats["requests"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["queue_wait_s_total"] += sum(waits)
+            self._stats["queue_wait_s_max"] = max(self._stats["queue_wait_s_max"], *waits)
+            self._stats["synthesis_s_total"] += elapsed
+        logger.info(
+            f"XTTS batch: {len(batch)} request(s), {len(by_speaker)} speaker(s), "
+            f"max queue wait {max(waits):.2f}s, synthesis {elapsed:.1f}s"
+        )
+
+    def _load_conditioning(self, speaker_wav: str, conditioning_path: str):
+        if conditioning_path and os.path.exists(conditioning_path):
+            import torch
+
+            try:
+                return torch.load(conditioning_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable speaker conditioning {conditioning_path}: {e}")
+        return self._tts.synthesizer.tts_model.get_conditioning_latents(audio_path=[speaker_wav])
+
+    def _synthesize_one(self, request: _SynthesisRequest, latents) -> None:
+        gpt_cond_latent, speaker_embedding = latents
+        synthesizer = self._tts.synthesizer
+
+        wav = []
+        for sentence in synthesizer.split_into_sentences(request.text):
+            out = synthesizer.tts_model.inference(
+                sentence, request.language, gpt_cond_latent, speaker_embedding,
+            )
+            wav += list(out["wav"])
+            wav += [0] * 10000  # short pause between sentences, as Synthesizer.tts does
+        synthesizer.save_wav(wav, request.output_path)
+
+
+def conditioning_path_for(speaker_wav: str, content_hash: str) -> str:
+    """Cached speaker latents live next to the voice sample, keyed by its content hash."""
+    stem, _ = os.path.splitext(speaker_wav)
+    return f"{stem}.{content_hash[:16]}.latents.pt"
+
+
+def remove_conditioning(speaker_wav: str) -> None:
+    stem, _ = os.path.splitext(speaker_wav)
+    for path in glob.glob(f"{glob.escape(stem)}.*.latents.pt"):
+        os.remove(path)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> XTTSEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = XTTSEngine(settings.TTS_BATCH_MAX, settings.TTS_BATCH_WINDOW_MS / 1000.0)
+    return _engine
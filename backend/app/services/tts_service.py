@@ -1,46 +1,119 @@
 import logging
 import os
+import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
+from app.services.storage_service import file_sha256, get_storage_path, local_path, put_file
+from app.services.tts_engine import get_engine, conditioning_path_for, remove_conditioning
 from config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# End of sentence: . ! ? and Devanagari danda/double danda, followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?\u0964\u0965])\s+")
+
 
 def generate_tts_audio(text: str, voice_sample_path: str, language: str = "en") -> str:
     """
     Generate TTS audio using voice cloning.
-    Returns relative path to generated audio file.
+    Returns the storage path of the generated audio file.
     """
     output_filename = f"{uuid.uuid4().hex}.wav"
     output_rel_path = os.path.join("generated", "audio", output_filename)
-    output_abs_path = os.path.join(settings.STORAGE_PATH, output_rel_path)
-    os.makedirs(os.path.dirname(output_abs_path), exist_ok=True)
+    output_abs_path = get_storage_path(output_rel_path)
 
-    voice_abs_path = os.path.join(settings.STORAGE_PATH, voice_sample_path)
+    voice_abs_path = local_path(voice_sample_path)
 
     if settings.TTS_BACKEND == "replicate":
-        _generate_via_replicate(text, voice_abs_path, output_abs_path, language)
+        synthesize = lambda segment, path: _generate_via_replicate(segment, voice_abs_path, path, language)  # noqa: E731
+        # Each segment is its own prediction, so long scripts synthesize in parallel
+        segments = split_script(text, settings.TTS_SEGMENT_MAX_CHARS)
+    else:
+        conditioning_path = conditioning_path_for(voice_abs_path, file_sha256(voice_sample_path))
+        synthesize = lambda segment, path: _generate_local(  # noqa: E731
+            segment, voice_abs_path, path, language, conditioning_path,
+        )
+        # The engine thread runs one request at a time and splits sentences itself;
+        # segments would only queue behind each other and add crossfades
+        segments = [text]
+
+    if len(segments) <= 1:
+        synthesize(text, output_abs_path)
     else:
-        _generate_local(text, voice_abs_path, output_abs_path, language)
+        _synthesize_segments(segments, synthesize, output_abs_path)
 
-    logger.info(f"TTS audio generated: {output_rel_path}")
+    output_rel_path = put_file(output_abs_path, output_rel_path)
+    logger.info(f"TTS audio generated: {output_rel_path} ({len(segments)} segment(s))")
     return output_rel_path
 
 
-def _generate_local(text: str, voice_path: str, output_path: str, language: str):
-    """Generate TTS locally using Coqui XTTS v2."""
+def split_script(text: str, max_chars: int) -> list:
+    """
+    Split a script on sentence boundaries (Latin and Devanagari punctuation)
+    and pack consecutive sentences into segments of at most max_chars.
+    A single over-long sentence becomes its own segment.
+    """
+    sentences = [s for s in SENTENCE_BOUNDARY.split(text.strip()) if s]
+    segments = []
+    for sentence in sentences:
+        if segments and len(segments[-1]) + 1 + len(sentence) <= max_chars:
+            segments[-1] = f"{segments[-1]} {sentence}"
+        else:
+            segments.append(sentence)
+    return segments
+
+
+def _synthesize_segments(segments: list, synthesize, output_path: str) -> None:
+    """Synthesize segments concurrently and join them with short crossfades into one WAV."""
+    from pydub import AudioSegment
+
+    part_paths = [f"{output_path}.part{i}.wav" for i in range(len(segments))]
     try:
-        from TTS.api import TTS
-
-        tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=False)
-        tts.tts_to_file(
-            text=text,
-            speaker_wav=voice_path,
-            language=language,
-            file_path=output_path,
+        with ThreadPoolExecutor(max_workers=settings.TTS_PARALLEL_SEGMENTS, thread_name_prefix="tts") as pool:
+            list(pool.map(synthesize, segments, part_paths))
+
+        combined = AudioSegment.from_wav(part_paths[0])
+        for path in part_paths[1:]:
+            part = AudioSegment.from_wav(path)
+            crossfade = min(settings.TTS_CROSSFADE_MS, len(combined), len(part))
+            combined = combined.append(part, crossfade=crossfade)
+        combined.export(output_path, format="wav")
+    finally:
+        for path in part_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def prepare_speaker_conditioning(voice_sample_path: str) -> None:
+    """
+    Precompute XTTS speaker latents for a voice sample so later reels skip
+    the conditioning pass. Stale latents from earlier samples are removed.
+    """
+    if settings.TTS_BACKEND != "local":
+        return
+
+    voice_abs_path = local_path(voice_sample_path)
+    remove_conditioning(voice_abs_path)
+    try:
+        get_engine().compute_conditioning(
+            voice_abs_path,
+            conditioning_path_for(voice_abs_path, file_sha256(voice_sample_path)),
         )
+    except ImportError:
+        logger.warning("Coqui TTS not installed, skipping speaker conditioning")
+
+
+def delete_speaker_conditioning(voice_sample_path: str) -> None:
+    # Latents sit next to the local copy of the sample; no need to fetch it
+    remove_conditioning(get_storage_path(voice_sample_path))
+
+
+def _generate_local(text: str, voice_path: str, output_path: str, language: str, conditioning_path: str = None):
+    """Generate TTS locally using Coqui XTTS v2."""
+    try:
+        get_engine().synthesize(text, voice_path, language, output_path, conditioning_path)
     except ImportError:
         logger.warning("Coqui TTS not installed, generating silent placeholder audio")
         _generate_placeholder(output_path, text)
@@ -48,36 +121,20 @@ def _generate_local(text: str, voice_path: str, output_path: str, language: str)
 
 def _generate_via_replicate(text: str, voice_path: str, output_path: str, language: str):
     """Generate TTS via Replicate API."""
-    import time
-    import replicate
-    import httpx
-
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            with open(voice_path, "rb") as f:
-                output = replicate.run(
-                    "lucataco/xtts-v2:684bc3855b37866c0c65add2ff39c78f3dea3f4ff103a436465326e0f438d55e",
-                    input={
-                        "text": text,
-                        "speaker": f,
-                        "language": language,
-                    },
-                )
-            break
-        except Exception as e:
-            if "429" in str(e) and attempt < max_retries - 1:
-                wait = 15 * (attempt + 1)
-                logger.warning(f"TTS rate limited, retrying in {wait}s")
-                time.sleep(wait)
-            else:
-                raise
+    from app.services.replicate_client import run_prediction, download_output
+
+    output = run_prediction(
+        "lucataco/xtts-v2:684bc3855b37866c0c65add2ff39c78f3dea3f4ff103a436465326e0f438d55e",
+        input={
+            "text": text,
+            "language": language,
+        },
+        files={"speaker": voice_path},
+    )
 
     # Output may be a URL string or FileOutput
     audio_url = str(output)
-    response = httpx.get(audio_url, timeout=120, follow_redirects=True)
-    with open(output_path, "wb") as f:
-        f.write(response.content)
+    download_output(audio_url, output_path, timeout=120)
 
 
 def _generate_placeholder(output_path: str, text: str):
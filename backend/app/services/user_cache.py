@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models import User
+from app.services.events_service import get_bus
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "user_cache"
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl_s seconds."""
+
+    def __init__(self, maxsize: int, ttl_s: float):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_s)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+_cache = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_S)
+_listening = False
+_listen_lock = threading.Lock()
+
+
+def get_cached_user(user_id: int) -> Optional[User]:
+    """
+    Detached User snapshot, or None on a miss. Snapshots are shared between
+    requests and must be treated as read-only; load the row in a session to
+    modify it, then call invalidate_user.
+    """
+    if settings.USER_CACHE_TTL_S <= 0:
+        return None
+    _ensure_listening()
+    return _cache.get(user_id)
+
+
+def cache_user(user: User) -> None:
+    if settings.USER_CACHE_TTL_S > 0:
+        _cache.set(user.id, user)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from this process's cache and tell other processes to do the same."""
+    _cache.invalidate(user_id)
+    get_bus().publish(INVALIDATION_CHANNEL, {"type": "user_invalidated", "user_id": user_id})
+
+
+def _ensure_listening() -> None:
+    global _listening
+    if _listening:
+        return
+    with _listen_lock:
+        if not _listening:
+            get_bus().add_listener(INVALIDATION_CHANNEL, lambda event: _cache.invalidate(event["user_id"]))
+            _listening = True
@@ -1,113 +1,175 @@
 import logging
 import os
+import re
 import subprocess
+import threading
+import time
 import uuid
+from collections import deque
+from typing import Callable, Optional
 
+from app.services.overlay_service import render_overlay
+from app.services.storage_service import get_storage_path, local_path, put_file
 from config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
-def _has_drawtext() -> bool:
-    """Check if FFmpeg was compiled with the drawtext filter."""
-    try:
-        result = subprocess.run(
-            ["ffmpeg", "-filters"],
-            capture_output=True, text=True, timeout=10,
-        )
-        return "drawtext" in result.stdout
-    except Exception:
-        return False
+# Named H.264 encode profiles, from fastest to highest quality
+ENCODE_PROFILES = {
+    "draft": {"preset": "veryfast", "crf": 28},
+    "standard": {"preset": "medium", "crf": 23},
+    "archive": {"preset": "slow", "crf": 18},
+}
+
+# Input header lines FFmpeg prints to stderr before it starts encoding
+DURATION_RE = re.compile(r"^\s*Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+AUDIO_STREAM_RE = re.compile(r"^\s*Stream #0:\d+\S*: Audio: (\w+)")
+AAC_ENCODE_ARGS = ["-c:a", "aac", "-b:a", "128k"]
+
+
+class _AudioNotAac(Exception):
+    """The input's audio can't be stream-copied into the output."""
 
 
-# Cache the check at module level
-DRAWTEXT_AVAILABLE = _has_drawtext()
+def profile_fingerprint(profile: str) -> str:
+    """Identifies everything about an encode profile that affects the output."""
+    params = ENCODE_PROFILES[profile]
+    return f"{profile}:libx264:{params['preset']}:crf{params['crf']}:aac128k:25fps"
 
 
 def post_process_video(
     video_raw_path: str,
     doctor_name: str,
     topic: str,
+    profile: str = "standard",
+    on_progress: Optional[Callable[[float, Optional[float]], None]] = None,
 ) -> str:
     """
-    Post-process video: scale to 9:16 (1080x1920), add text overlays if available, encode H.264.
-    Returns (relative path to final video, duration in seconds).
+    Post-process video: scale to 9:16 (1080x1920), add text overlays,
+    encode H.264 with the given profile. AAC audio is copied instead of re-encoded.
+    on_progress(percent, eta_seconds) is called as FFmpeg reports progress.
+    Returns (storage path of the final video, duration in seconds).
     """
+    params = ENCODE_PROFILES[profile]
     output_filename = f"{uuid.uuid4().hex}.mp4"
     output_rel_path = os.path.join("generated", "video_final", output_filename)
-    output_abs_path = os.path.join(settings.STORAGE_PATH, output_rel_path)
-    os.makedirs(os.path.dirname(output_abs_path), exist_ok=True)
-
-    input_abs_path = os.path.join(settings.STORAGE_PATH, video_raw_path)
-
-    # Base filter: scale and pad to 9:16
-    vf = "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black"
-
-    # Add text overlays only if drawtext is available
-    if DRAWTEXT_AVAILABLE:
-        safe_name = _escape_ffmpeg_text(doctor_name)
-        safe_topic = _escape_ffmpeg_text(topic[:60])
-        vf += (
-            f",drawtext=text='{safe_topic}'"
-            ":fontcolor=white:fontsize=36:borderw=2:bordercolor=black"
-            ":x=(w-text_w)/2:y=80"
-            f",drawtext=text='Dr. {safe_name}'"
-            ":fontcolor=white:fontsize=32:borderw=2:bordercolor=black"
-            ":x=(w-text_w)/2:y=h-120"
-        )
-    else:
-        logger.warning("drawtext filter not available — skipping text overlays")
-
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", input_abs_path,
-        "-vf", vf,
-        "-c:v", "libx264", "-preset", "medium", "-crf", "23",
-        "-c:a", "aac", "-b:a", "128k",
-        "-r", "25",
-        "-movflags", "+faststart",
-        output_abs_path,
-    ]
-
-    logger.info(f"Running FFmpeg post-processing")
-
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        timeout=300,
-    )
+    output_abs_path = get_storage_path(output_rel_path)
 
-    if result.returncode != 0:
-        logger.error(f"FFmpeg error: {result.stderr}")
-        raise RuntimeError(f"FFmpeg post-processing failed: {result.stderr[-500:]}")
+    input_abs_path = local_path(video_raw_path)
 
-    duration = _get_video_duration(output_abs_path)
-    logger.info(f"Post-processed video: {output_rel_path} ({duration:.1f}s)")
+    overlay_abs_path = render_overlay(topic, doctor_name)
 
-    return output_rel_path, duration
+    # Scale and pad to 9:16, then composite the pre-rendered text overlay
+    filter_graph = (
+        "[0:v]scale=1080:1920:force_original_aspect_ratio=decrease,"
+        "pad=1080:1920:(ow-iw)/2:(oh-ih)/2:black[bg];"
+        "[bg][1:v]overlay=0:0[v]"
+    )
 
+    def command(audio_args: list) -> list:
+        return [
+            "ffmpeg", "-y",
+            "-i", input_abs_path,
+            "-i", overlay_abs_path,
+            "-filter_complex", filter_graph,
+            "-map", "[v]", "-map", "0:a?",
+            "-c:v", "libx264", "-preset", params["preset"], "-crf", str(params["crf"]),
+            *audio_args,
+            "-r", "25",
+            "-movflags", "+faststart",
+            "-progress", "pipe:1", "-nostats",
+            output_abs_path,
+        ]
+
+    logger.info(f"Running FFmpeg post-processing (profile={profile})")
+
+    # Lip-sync output is normally AAC already, so try copying it; FFmpeg is
+    # stopped before encoding anything if its input header says otherwise
+    try:
+        duration = _run_ffmpeg_with_progress(command(["-c:a", "copy"]), on_progress, timeout=300, copy_audio=True)
+    except _AudioNotAac as e:
+        logger.info(f"Input audio is {e}, re-encoding it to AAC")
+        duration = _run_ffmpeg_with_progress(command(AAC_ENCODE_ARGS), on_progress, timeout=300)
+    output_rel_path = put_file(output_abs_path, output_rel_path)
+    logger.info(f"Post-processed video: {output_rel_path} ({duration:.1f}s)")
 
-def _escape_ffmpeg_text(text: str) -> str:
-    """Escape special characters for FFmpeg drawtext filter."""
-    return text.replace("'", "'\\''").replace(":", "\\:").replace("\\", "\\\\")
+    return output_rel_path, duration
 
 
-def _get_video_duration(video_path: str) -> float:
-    """Get video duration in seconds using ffprobe."""
+def _run_ffmpeg_with_progress(cmd: list, on_progress, timeout: int, copy_audio: bool = False) -> float:
+    """
+    Run FFmpeg with -progress on stdout, parsing it as it arrives.
+    The input duration and audio codec come from the header FFmpeg prints
+    on stderr, so the input is never probed separately. With copy_audio,
+    non-AAC input audio stops FFmpeg and raises _AudioNotAac.
+    Only the tail of stderr is kept for error reporting.
+    Returns the encoded duration in seconds from the progress stream.
+    """
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL, text=True,
+    )
+    stderr_tail = deque(maxlen=40)
+    header = {"duration": 0.0, "audio_codec": None}
+
+    def read_stderr():
+        section = None  # which "Input #n" block of the header we are in
+        for line in process.stderr:
+            stderr_tail.append(line)
+            if line.startswith("Input #"):
+                section = line.split(",")[0]
+            elif line.startswith("Stream mapping:"):
+                section = None
+                if copy_audio and header["audio_codec"] not in (None, "aac"):
+                    process.kill()
+            elif section != "Input #0":
+                continue
+            elif match := DURATION_RE.match(line):
+                hours, minutes, seconds = match.groups()
+                header["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            elif header["audio_codec"] is None and (match := AUDIO_STREAM_RE.match(line)):
+                header["audio_codec"] = match.group(1)
+
+    stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+    stderr_thread.start()
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+
+    started = time.monotonic()
+    out_time = 0.0
+    speed = None
     try:
-        result = subprocess.run(
-            [
-                "ffprobe", "-v", "quiet",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        return float(result.stdout.strip())
-    except Exception:
-        return 0.0
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            if key == "out_time_us" and value.isdigit():
+                out_time = int(value) / 1_000_000
+            elif key == "speed" and value.endswith("x"):
+                try:
+                    speed = float(value[:-1])
+                except ValueError:
+                    speed = None
+            elif key == "progress" and on_progress and header["duration"]:
+                total_duration = header["duration"]
+                percent = min(100.0, out_time / total_duration * 100)
+                eta = (total_duration - out_time) / speed if speed else None
+                on_progress(round(percent, 1), round(eta, 1) if eta is not None else None)
+        process.wait()
+    finally:
+        # Don't leave FFmpeg running if a progress callback raised
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        timer.cancel()
+        stderr_thread.join(timeout=5)
+
+    if copy_audio and header["audio_codec"] not in (None, "aac"):
+        raise _AudioNotAac(header["audio_codec"])
+    if process.returncode != 0:
+        stderr = "".join(stderr_tail)
+        if time.monotonic() - started >= timeout:
+            stderr = f"timed out after {timeout}s\n{stderr}"
+        logger.error(f"FFmpeg error: {stderr}")
+        raise RuntimeError(f"FFmpeg post-processing failed: {stderr[-500:]}")
+
+    return out_time
@@ -0,0 +1,26 @@
+import asyncio
+import threading
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Process-wide event loop running on a daemon thread. Sync code (pipeline
+    jobs run in worker threads) submits coroutines to it, so async clients
+    and their connection pools are shared across all jobs in the process.
+    """
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="aio-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro, timeout: float = None):
+    """Run a coroutine on the shared loop and block the calling thread for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result(timeout)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+async def download_file(
+    url: str,
+    dest_path: str,
+    timeout: float = 120,
+    client: Optional[httpx.AsyncClient] = None,
+    expected_sha256: Optional[str] = None,
+    max_resumes: int = 3,
+) -> int:
+    """
+    Stream url to dest_path in chunks. Dropped connections are resumed with
+    an HTTP Range request; the file only appears at dest_path (atomic rename)
+    once its size matches Content-Length and, if given, its SHA-256 matches.
+    Returns the number of bytes written.
+    """
+    tmp_path = f"{dest_path}.part"
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(follow_redirects=True)
+
+    digest = hashlib.sha256()
+    received = 0
+    total = None
+    try:
+        for attempt in range(max_resumes + 1):
+            headers = {"Range": f"bytes={received}-"} if received else {}
+            try:
+                async with client.stream("GET", url, headers=headers, timeout=timeout, follow_redirects=True) as response:
+                    if received and response.status_code != 206:
+                        # Server ignored the Range header: start over
+                        logger.warning(f"Server does not support resume, restarting download of {url}")
+                        digest = hashlib.sha256()
+                        received = 0
+                    response.raise_for_status()
+
+                    if total is None:
+                        total = _content_total(response)
+
+                    with open(tmp_path, "ab" if received else "wb") as f:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            received += len(chunk)
+            except httpx.TransportError as e:
+                if attempt == max_resumes:
+                    raise DownloadError(f"Download failed after {attempt + 1} attempts: {e}") from e
+                logger.warning(f"Download interrupted at {received} bytes, resuming ({e})")
+                continue
+
+            if total is None or received >= total:
+                break
+            logger.warning(f"Download truncated at {received}/{total} bytes, resuming")
+        else:
+            raise DownloadError(f"Download incomplete: {received}/{total} bytes")
+
+        if total is not None and received != total:
+            raise DownloadError(f"Size mismatch: got {received} bytes, expected {total}")
+        if received == 0:
+            raise DownloadError("Downloaded file is empty")
+        if expected_sha256 and digest.hexdigest() != expected_sha256:
+            raise DownloadError("Checksum mismatch")
+
+        os.replace(tmp_path, dest_path)
+        return received
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if own_client:
+            await client.aclose()
+
+
+def _content_total(response: httpx.Response) -> Optional[int]:
+    content_range = response.headers.get("content-range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[-1]
+        return int(total) if total.isdigit() else None
+    if response.headers.get("content-encoding"):
+        # Content-Length is the compressed size; we count decoded bytes
+        return None
+    content_length = response.headers.get("content-length")
+    return int(content_length) if content_length and content_length.isdigit() else None
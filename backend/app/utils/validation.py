@@ -1,60 +1,113 @@
 from __future__ import annotations
 
-import io
+import json
+import os
+import subprocess
+import wave
+from typing import Optional
+
 from PIL import Image
-from pydub import AudioSegment
+
+AUDIO_EXTENSIONS = ("wav", "mp3", "m4a", "ogg", "webm")
 
 
-def validate_image(file_bytes: bytes, max_size_mb: int = 10, min_dimension: int = 512) -> tuple[bool, str]:
-    """Validate uploaded image. Returns (is_valid, error_message)."""
-    size_mb = len(file_bytes) / (1024 * 1024)
+def validate_image(path: str, max_size_mb: int = 10, min_dimension: int = 512) -> tuple[bool, str]:
+    """Validate an uploaded image file. Returns (is_valid, error_message)."""
+    size_mb = os.path.getsize(path) / (1024 * 1024)
     if size_mb > max_size_mb:
         return False, f"Image too large: {size_mb:.1f}MB (max {max_size_mb}MB)"
 
     try:
-        img = Image.open(io.BytesIO(file_bytes))
+        # Only the header is read to get the format and size
+        with Image.open(path) as img:
+            image_format, (w, h) = img.format, img.size
     except Exception:
         return False, "Invalid image file"
 
-    if img.format not in ("JPEG", "PNG"):
-        return False, f"Unsupported format: {img.format}. Use JPEG or PNG."
+    if image_format not in ("JPEG", "PNG"):
+        return False, f"Unsupported format: {image_format}. Use JPEG or PNG."
 
-    w, h = img.size
     if w < min_dimension or h < min_dimension:
         return False, f"Image too small: {w}x{h} (min {min_dimension}x{min_dimension})"
 
     return True, ""
 
 
-def validate_audio(file_bytes: bytes, filename: str, max_size_mb: int = 50, min_duration_s: int = 10, max_duration_s: int = 30) -> tuple[bool, str]:
-    """Validate uploaded audio. Returns (is_valid, error_message)."""
-    size_mb = len(file_bytes) / (1024 * 1024)
+def validate_audio(path: str, filename: str, max_size_mb: int = 50, min_duration_s: int = 10, max_duration_s: int = 30) -> tuple[bool, str]:
+    """
+    Cheap pre-decode checks of an uploaded audio file. Returns (is_valid, error_message).
+    The duration comes from container metadata; files without one (e.g. some
+    browser-recorded webm) pass here and are checked after convert_audio_to_wav.
+    """
+    size_mb = os.path.getsize(path) / (1024 * 1024)
     if size_mb > max_size_mb:
         return False, f"Audio too large: {size_mb:.1f}MB (max {max_size_mb}MB)"
 
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-    if ext not in ("wav", "mp3", "m4a", "ogg", "webm"):
+    if ext not in AUDIO_EXTENSIONS:
         return False, f"Unsupported audio format: .{ext}"
 
-    try:
-        audio = AudioSegment.from_file(io.BytesIO(file_bytes), format=ext if ext != "m4a" else "mp4")
-        duration_s = len(audio) / 1000.0
-    except Exception:
-        return False, "Could not read audio file"
+    duration_s = probe_audio_duration(path)
+    if duration_s is None:
+        return True, ""
+    return check_audio_duration(duration_s, min_duration_s, max_duration_s)
 
+
+def check_audio_duration(duration_s: float, min_duration_s: int, max_duration_s: int) -> tuple[bool, str]:
     if duration_s < min_duration_s:
         return False, f"Audio too short: {duration_s:.1f}s (min {min_duration_s}s)"
     if duration_s > max_duration_s:
         return False, f"Audio too long: {duration_s:.1f}s (max {max_duration_s}s)"
-
     return True, ""
 
 
-def convert_audio_to_wav(file_bytes: bytes, filename: str, sample_rate: int = 22050) -> bytes:
-    """Convert any audio to WAV 22050Hz mono."""
-    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-    audio = AudioSegment.from_file(io.BytesIO(file_bytes), format=ext if ext != "m4a" else "mp4")
-    audio = audio.set_frame_rate(sample_rate).set_channels(1)
-    buf = io.BytesIO()
-    audio.export(buf, format="wav")
-    return buf.getvalue()
+def probe_audio_duration(path: str) -> Optional[float]:
+    """Duration in seconds from container/stream metadata via ffprobe, without decoding; None if unknown."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "quiet",
+                "-select_streams", "a:0",
+                "-show_entries", "format=duration:stream=duration",
+                "-of", "json",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        info = json.loads(result.stdout)
+    except Exception:
+        return None
+
+    if not info.get("streams"):
+        return None
+    for value in (info["streams"][0].get("duration"), info.get("format", {}).get("duration")):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def convert_audio_to_wav(src_path: str, dest_path: str, sample_rate: int = 22050, max_duration_s: Optional[float] = None) -> float:
+    """
+    Decode any audio file once and write it as WAV 16-bit mono at sample_rate,
+    in a single ffmpeg process. Decoding stops just past max_duration_s so an
+    over-long file without duration metadata can't cost a full decode.
+    Returns the duration of the written WAV in seconds.
+    """
+    cmd = ["ffmpeg", "-y", "-v", "error", "-nostdin", "-i", src_path, "-vn", "-map", "a:0"]
+    if max_duration_s is not None:
+        cmd += ["-t", str(max_duration_s + 1)]
+    cmd += ["-ac", "1", "-ar", str(sample_rate), "-c:a", "pcm_s16le", "-f", "wav", dest_path]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("Audio conversion timed out")
+    if result.returncode != 0:
+        raise RuntimeError(f"Audio conversion failed: {result.stderr[-500:]}")
+
+    with wave.open(dest_path, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
@@ -0,0 +1,193 @@
+"""
+Standalone job worker for the reel pipeline.
+
+Run from the backend directory:
+
+    python -m app.worker --concurrency 4
+
+Each worker process leases jobs from the `jobs` table and runs them in a
+thread pool, so render throughput scales by starting more processes.
+--concurrency bounds the CPU-bound stages; --remote-concurrency adds job
+slots for reels that are only waiting on a Replicate prediction.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import SessionLocal
+from app.models import Job
+from app.services import metrics_service, queue_service, script_cache_service
+from app.services.pipeline_service import (
+    run_script_generation, run_batch_script_generation, run_full_pipeline,
+    run_speaker_conditioning, run_encode_upgrade, set_cpu_concurrency,
+)
+from app.services.tts_engine import get_engine
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {
+    "script": run_script_generation,
+    "script_batch": run_batch_script_generation,
+    "pipeline": run_full_pipeline,
+    "speaker_conditioning": run_speaker_conditioning,
+    "encode_upgrade": run_encode_upgrade,
+}
+
+
+class Worker:
+    def __init__(
+        self, concurrency: int, poll_interval: float, session_factory=SessionLocal,
+        remote_concurrency: int = settings.WORKER_REMOTE_CONCURRENCY,
+    ):
+        self.concurrency = concurrency
+        self.remote_concurrency = remote_concurrency
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        # Restarted containers reuse hostname and PID; the random part keeps a new
+        # process from renewing the leases its dead predecessor left behind
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._slots = threading.Semaphore(concurrency + remote_concurrency)
+        set_cpu_concurrency(concurrency)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        logger.info(
+            f"Worker {self.worker_id} started "
+            f"(concurrency={self.concurrency}, remote_concurrency={self.remote_concurrency})"
+        )
+        threading.Thread(target=self._maintain, name="job-heartbeat", daemon=True).start()
+        max_jobs = self.concurrency + self.remote_concurrency
+        with ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job") as pool:
+            while not self._stop.is_set():
+                if not self._slots.acquire(timeout=self.poll_interval):
+                    continue
+
+                claimed = self._claim()
+                if claimed is None:
+                    self._slots.release()
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                pool.submit(self._execute, *claimed)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def _maintain(self) -> None:
+        """
+        Heartbeat our leases, report our stats and periodically sweep jobs
+        abandoned by dead workers.
+        """
+        last_sweep = 0.0
+        while not self._stop.wait(settings.JOB_HEARTBEAT_S):
+            db = self.session_factory()
+            try:
+                queue_service.heartbeat(db, self.worker_id)
+                metrics_service.report(db, self.worker_id, self.stats())
+                if time.monotonic() - last_sweep >= settings.JOB_SWEEP_INTERVAL_S:
+                    last_sweep = time.monotonic()
+                    queue_service.requeue_expired(db)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id}: heartbeat/sweep failed: {e}")
+                db.rollback()
+            finally:
+                db.close()
+
+    def stats(self) -> dict:
+        """Snapshot of this process's counters, for /api/metrics."""
+        return {"tts": get_engine().stats(), "script_cache": script_cache_service.stats()}
+
+    def _claim(self):
+        """(job id, attempt) of a newly leased job, or None."""
+        db = self.session_factory()
+        try:
+            job = queue_service.claim_next(db, self.worker_id)
+            return (job.id, job.attempts) if job else None
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: failed to claim job: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _execute(self, job_id: int, attempt: int) -> None:
+        try:
+            db = self.session_factory()
+            try:
+                job = db.query(Job).filter(Job.id == job_id).first()
+                kind, reel_id, payload = job.kind, job.reel_id, queue_service.get_payload(job)
+            finally:
+                # Handlers open their own short sessions; don't pin a connection meanwhile
+                db.close()
+
+            error = None
+            handler = JOB_HANDLERS.get(kind)
+            if handler is None:
+                error = f"Unknown job kind: {kind}"
+            else:
+                try:
+                    handler(reel_id, self.session_factory, **payload)
+                except Exception as e:
+                    logger.error(f"Job {job_id} ({kind}) failed: {e}")
+                    error = str(e)
+
+            # A job deleted along with its reel, or re-leased elsewhere, is left as is
+            db = self.session_factory()
+            try:
+                if error is None:
+                    queue_service.complete(db, job_id, self.worker_id, attempt)
+                else:
+                    queue_service.fail(db, job_id, self.worker_id, attempt, error)
+            finally:
+                db.close()
+        finally:
+            self._slots.release()
+
+
+def start_embedded_worker(concurrency: int) -> Worker:
+    """Run a worker on a daemon thread inside the current (web) process."""
+    worker = Worker(concurrency, settings.WORKER_POLL_INTERVAL_S)
+    threading.Thread(target=worker.run, name="embedded-worker", daemon=True).start()
+    return worker
+
+
+def _preload_tts() -> None:
+    try:
+        get_engine().load()
+    except ImportError:
+        logger.warning("Coqui TTS not installed, skipping XTTS preload")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ReelGen pipeline worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--remote-concurrency", type=int, default=settings.WORKER_REMOTE_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL_S)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if settings.REPLICATE_API_TOKEN:
+        os.environ["REPLICATE_API_TOKEN"] = settings.REPLICATE_API_TOKEN
+    if settings.GROQ_API_KEY:
+        os.environ["GROQ_API_KEY"] = settings.GROQ_API_KEY
+
+    if settings.TTS_BACKEND == "local" and settings.TTS_PRELOAD:
+        threading.Thread(target=_preload_tts, name="xtts-preload", daemon=True).start()
+
+    worker = Worker(args.concurrency, args.poll_interval, remote_concurrency=args.remote_concurrency)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,26 @@ from functools import lru_cache
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./reelgen.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_ASYNC: bool = False  # serve the API from async routers; needs requirements-async.txt
     SECRET_KEY: str = "change-me-in-production"
     GROQ_API_KEY: str = ""
     REPLICATE_API_TOKEN: str = ""
+    REPLICATE_API_BASE: str = "https://api.replicate.com/v1"
+    REPLICATE_WEBHOOK_URL: str = ""  # e.g. https://<host>/api/webhooks/replicate
+    REPLICATE_WEBHOOK_SECRET: str = ""  # required for webhooks; without it predictions are polled
+    REPLICATE_POLL_INTERVAL_S: float = 2.0
+    REPLICATE_PREDICTION_TIMEOUT_S: int = 900
+    REPLICATE_MAX_CONNECTIONS: int = 20
     TTS_BACKEND: str = "local"  # "local" or "replicate"
+    TTS_PRELOAD: bool = True  # load the local XTTS model when a worker starts
+    TTS_BATCH_MAX: int = 4
+    TTS_BATCH_WINDOW_MS: int = 50
+    TTS_SEGMENT_MAX_CHARS: int = 200  # Replicate backend: scripts are synthesized in sentence-aligned segments
+    TTS_PARALLEL_SEGMENTS: int = 4  # segment predictions in flight per script
+    TTS_CROSSFADE_MS: int = 40
     STORAGE_PATH: str = "./storage"
 
     # JWT settings
@@ -22,6 +38,80 @@ class Settings(BaseSettings):
     MIN_VOICE_DURATION_S: int = 10
     MAX_VOICE_DURATION_S: int = 30
 
+    # Object storage: "local" (files under STORAGE_PATH) or "s3" (any S3-compatible
+    # store, e.g. AWS or MinIO; STORAGE_PATH then only holds scratch files and
+    # cached copies). Keys are the relative paths, so an existing STORAGE_PATH
+    # can be copied over with `aws s3 sync`.
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://localhost:9000 for MinIO; empty for AWS
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = ""  # empty uses the default AWS credential chain
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_MAX_CONNECTIONS: int = 20
+    S3_MULTIPART_THRESHOLD_MB: int = 16
+    S3_MULTIPART_CHUNK_MB: int = 8
+    S3_CACHE_MAX_MB: int = 2048  # local copies of objects; least recently used beyond this are removed
+    STORAGE_URL_EXPIRY_S: int = 3600  # lifetime of signed download URLs
+
+    # Store files once under objects/<sha256> with DB reference counts
+    # (run scripts/migrate_storage_to_cas.py after enabling)
+    STORAGE_CONTENT_ADDRESSED: bool = False
+
+    # Photo normalization for lip-sync (face-centered crop, then downscale)
+    PHOTO_ASPECT_RATIO: str = "9:16"  # matches the reel frame, so the video needs no padding
+    PHOTO_MAX_DIMENSION: int = 1024  # longest side of the normalized photo
+
+    # External API rate limits (per process, per provider/model)
+    REPLICATE_RATE_PER_MIN: int = 60
+    REPLICATE_API_RATE_PER_MIN: int = 600  # file uploads and status polls, shared by all models
+    GROQ_RATE_PER_MIN: int = 30
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_MAX_RETRIES: int = 3
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_S: int = 60
+
+    # Video encoding
+    OVERLAY_FONT_PATH: str = ""  # TTF used for caption overlays; needs Devanagari glyphs for Hindi
+    OVERLAY_CACHE_MAX_FILES: int = 500  # rendered caption PNGs kept; least recently used beyond this are removed
+    DEFAULT_ENCODE_PROFILE: str = "standard"  # "draft", "standard" or "archive"
+    DRAFT_FIRST_ENCODE: bool = False  # publish a veryfast draft, then upgrade in the background
+
+    # Shared script cache
+    SCRIPT_CACHE_ENABLED: bool = True
+    SCRIPT_CACHE_VARIANTS: int = 3  # distinct scripts per topic, rotated across users
+    SCRIPT_CACHE_TTL_HOURS: int = 720
+    SCRIPT_CACHE_MAX_ENTRIES: int = 5000
+
+    # Reel listing
+    REEL_LIST_PREVIEW_CHARS: int = 160
+    REEL_LIST_COUNT_CAP: int = 1000  # totals above this are reported as capped
+
+    # Batch reel creation
+    SCRIPT_BATCH_PARALLELISM: int = 4
+
+    # Status events: "memory" (single process), "postgres" (LISTEN/NOTIFY across
+    # processes) or "auto" (postgres when DATABASE_URL is Postgres)
+    EVENTS_BACKEND: str = "auto"
+
+    # Authenticated user cache (0 disables); invalidated over the events backend
+    USER_CACHE_TTL_S: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Job worker
+    WORKER_CONCURRENCY: int = 2  # CPU-bound stages (local TTS, FFmpeg) running at once
+    WORKER_REMOTE_CONCURRENCY: int = 8  # extra job slots for reels waiting on Replicate predictions
+    WORKER_POLL_INTERVAL_S: float = 2.0
+    EMBEDDED_WORKER: bool = False  # run a worker thread inside the web process; the Docker image turns this on
+    JOB_HEARTBEAT_S: int = 30
+    JOB_LEASE_S: int = 120  # running jobs without a heartbeat for this long are requeued
+    JOB_SWEEP_INTERVAL_S: int = 60
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Bearer token for /api/metrics; the endpoint is disabled while empty
+    METRICS_TOKEN: str = ""
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -1,15 +1,20 @@
+import hmac
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
+from sqlalchemy.orm import Session
+
 from config import get_settings
-from app.database import engine, Base
-from app.models import User, Reel  # noqa: F401 - ensure models are registered
+from app.database import engine, async_engine, Base, get_db
+from app.models import User, Reel, Job, ScriptCache, StoredObject, WorkerStats  # noqa: F401 - ensure models are registered
+from app.middleware.upload_limit import UploadLimitMiddleware
+from app.services.storage_service import is_remote_storage, presign_url
 
 
 settings = get_settings()
@@ -27,11 +32,20 @@ async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
     # Ensure storage directories exist
     for subdir in [
-        "uploads/photos", "uploads/voice_samples",
+        "uploads/photos", "uploads/photos_normalized", "uploads/voice_samples",
         "generated/audio", "generated/video_raw", "generated/video_final",
     ]:
         os.makedirs(os.path.join(settings.STORAGE_PATH, subdir), exist_ok=True)
+
+    worker = None
+    if settings.EMBEDDED_WORKER:
+        from app.worker import start_embedded_worker
+        worker = start_embedded_worker(settings.WORKER_CONCURRENCY)
     yield
+    if worker:
+        worker.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 app = FastAPI(
@@ -48,10 +62,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Enforced before FastAPI parses the multipart form; the routes re-check the file itself
+app.add_middleware(UploadLimitMiddleware, limits_mb={
+    "/api/users/me/photo": settings.MAX_IMAGE_SIZE_MB,
+    "/api/users/me/voice-sample": settings.MAX_AUDIO_SIZE_MB,
+})
 
-# Mount storage for serving files
+# Serve stored files: straight from disk, or by redirecting to a signed object-store URL
 os.makedirs(settings.STORAGE_PATH, exist_ok=True)
-app.mount("/storage", StaticFiles(directory=settings.STORAGE_PATH), name="storage")
+if is_remote_storage():
+    @app.get("/storage/{rel_path:path}")
+    def storage_redirect(rel_path: str):
+        return RedirectResponse(presign_url(rel_path))
+else:
+    app.mount("/storage", StaticFiles(directory=settings.STORAGE_PATH), name="storage")
 
 
 @app.get("/api/health")
@@ -59,12 +83,30 @@ def health_check():
     return {"status": "ok", "service": "reelgen"}
 
 
+@app.get("/api/metrics")
+def metrics(authorization: str = Header(default=""), db: Session = Depends(get_db)):
+    """Stats reported by each live worker; requires METRICS_TOKEN as a bearer token."""
+    from app.services import metrics_service, script_cache_service
+
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return {"workers": metrics_service.collect(db), "script_cache": script_cache_service.summary(db)}
+
+
 # Import and include routers (added as they're implemented)
-from app.routers import auth, users, reels  # noqa: E402
+from app.routers import webhooks  # noqa: E402
+
+if settings.DB_ASYNC:
+    from app.routers.aio import auth, users, reels  # noqa: E402
+else:
+    from app.routers import auth, users, reels  # noqa: E402
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(reels.router, prefix="/api/reels", tags=["reels"])
+app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 
 # --- Serve frontend build (production) ---
 FRONTEND_DIST = Path(__file__).resolve().parent.parent / "frontend" / "dist"
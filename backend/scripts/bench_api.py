@@ -0,0 +1,114 @@
+"""
+Compare the sync and async API stacks under concurrent load.
+
+Starts the app under uvicorn once per mode (DB_ASYNC=false / true) against
+the same database, signs up a throwaway user and hammers a few read
+endpoints, then prints requests/second and latency percentiles. The async
+mode needs the drivers from requirements-async.txt.
+
+    cd backend && python scripts/bench_api.py --requests 5000 --concurrency 100
+
+Use --database-url to benchmark against Postgres instead of a temp SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ["/api/reels/?include_total=true", "/api/users/me"]
+
+
+async def _wait_until_up(base_url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+async def _run_load(base_url: str, total: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        signup = await client.post("/api/auth/signup", json={
+            "email": f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            "password": "benchmark-password",
+            "full_name": "Bench User",
+        })
+        signup.raise_for_status()
+        headers = {"Authorization": f"Bearer {signup.json()['access_token']}"}
+
+        latencies = []
+        errors = 0
+        counter = iter(range(total))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                started = time.perf_counter()
+                response = await client.get(ENDPOINTS[i % len(ENDPOINTS)], headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors,
+    }
+
+
+def _bench_mode(mode: str, args, database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, DB_ASYNC=str(mode == "async").lower(), EMBEDDED_WORKER="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        asyncio.run(_wait_until_up(base_url))
+        asyncio.run(_run_load(base_url, min(200, args.requests), args.concurrency))  # warm-up
+        return asyncio.run(_run_load(base_url, args.requests, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the sync vs async API stacks")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(f"{args.requests} requests, concurrency {args.concurrency}, endpoints {', '.join(ENDPOINTS)}")
+        print(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for mode in args.modes.split(","):
+            result = _bench_mode(mode, args, database_url)
+            print(f"{mode:<6} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
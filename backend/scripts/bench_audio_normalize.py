@@ -0,0 +1,87 @@
+"""
+Micro-benchmark of voice-sample validation + WAV normalization.
+
+Compares the previous pydub path (decode once to measure the duration,
+then decode again to resample) with the current one (ffprobe for the
+duration, one ffmpeg process to decode and resample) across the upload
+formats we accept. Test inputs are synthesized with ffmpeg.
+
+    cd backend && python scripts/bench_audio_normalize.py --seconds 20 --runs 5
+"""
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.validation import AUDIO_EXTENSIONS, convert_audio_to_wav, probe_audio_duration  # noqa: E402
+
+ENCODERS = {
+    "wav": ["-c:a", "pcm_s16le"],
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "128k"],
+    "m4a": ["-c:a", "aac", "-b:a", "128k"],
+    "ogg": ["-c:a", "libvorbis"],
+    "webm": ["-c:a", "libopus"],
+}
+
+
+def _make_input(directory: str, ext: str, seconds: int) -> str:
+    path = os.path.join(directory, f"sample.{ext}")
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}:sample_rate=44100",
+         "-ac", "2", *ENCODERS[ext], path],
+        check=True,
+    )
+    return path
+
+
+def _legacy_pydub(path: str, ext: str) -> float:
+    from pydub import AudioSegment
+
+    fmt = ext if ext != "m4a" else "mp4"
+    with open(path, "rb") as f:
+        file_bytes = f.read()
+    duration_s = len(AudioSegment.from_file(io.BytesIO(file_bytes), format=fmt)) / 1000.0
+    audio = AudioSegment.from_file(io.BytesIO(file_bytes), format=fmt).set_frame_rate(22050).set_channels(1)
+    audio.export(io.BytesIO(), format="wav")
+    return duration_s
+
+
+def _single_decode(path: str, dest: str) -> float:
+    probe_audio_duration(path)
+    return convert_audio_to_wav(path, dest, max_duration_s=60)
+
+
+def _time(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark voice-sample validation + normalization")
+    parser.add_argument("--seconds", type=int, default=20, help="length of the synthesized inputs")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "out.wav")
+        print(f"{args.seconds}s inputs, median of {args.runs} runs")
+        print(f"{'format':<6} {'pydub x2 ms':>12} {'ffmpeg x1 ms':>13} {'speedup':>8}")
+        for ext in AUDIO_EXTENSIONS:
+            path = _make_input(tmp, ext, args.seconds)
+            legacy_ms = _time(lambda: _legacy_pydub(path, ext), args.runs)
+            current_ms = _time(lambda: _single_decode(path, dest), args.runs)
+            print(f"{ext:<6} {legacy_ms:>12.1f} {current_ms:>13.1f} {legacy_ms / current_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
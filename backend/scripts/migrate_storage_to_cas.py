@@ -0,0 +1,125 @@
+"""
+Move existing stored files into the content-addressed layout.
+
+Walks every file referenced by users and reels, moves it to
+objects/<sha[:2]>/<sha[2:4]>/<sha><ext> (deleting duplicates), records
+reference counts and rewrites the paths in the database. Final-video
+fingerprints that were current before the move are re-keyed so finished
+reels aren't re-rendered. Safe to re-run; already-migrated paths are skipped.
+
+    cd backend && STORAGE_CONTENT_ADDRESSED=true python scripts/migrate_storage_to_cas.py [--dry-run]
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal  # noqa: E402
+from app.models import User, Reel  # noqa: E402
+from app.services import storage_service  # noqa: E402
+from app.services.pipeline_service import _final_fingerprint  # noqa: E402
+from app.services.tts_service import delete_speaker_conditioning  # noqa: E402
+from app.services.user_cache import invalidate_user  # noqa: E402
+from config import get_settings  # noqa: E402
+
+settings = get_settings()
+logger = logging.getLogger("migrate_storage_to_cas")
+
+USER_COLUMNS = ("photo_path", "photo_normalized_path", "voice_sample_path")
+REEL_COLUMNS = ("audio_path", "video_raw_path", "video_final_path")
+
+
+class Migrator:
+    def __init__(self, dry_run: bool):
+        self.dry_run = dry_run
+        self.moved: dict = {}  # old path -> new path, for files referenced more than once
+        self.sizes: dict = {}  # sha256 -> size, to report what deduplication saves
+        self.files = 0
+        self.bytes_total = 0
+
+    def migrate(self, rel_path):
+        """New path for a stored file, moving it on first sight; None if there is nothing to move."""
+        if not rel_path or storage_service.is_content_addressed(rel_path):
+            return None
+        # Checked before existence: the first sighting already moved the file away
+        if rel_path in self.moved:
+            if not self.dry_run:
+                storage_service.retain(self.moved[rel_path])
+            return self.moved[rel_path]
+
+        if not storage_service.file_exists(rel_path):
+            logger.warning(f"Missing file, left as is: {rel_path}")
+            return None
+
+        sha256 = storage_service.file_sha256(rel_path)
+        size = storage_service.file_size(rel_path)
+        self.files += 1
+        self.bytes_total += size
+        self.sizes[sha256] = size
+        new_path = storage_service.content_path(sha256, os.path.splitext(rel_path)[1])
+        if not self.dry_run:
+            new_path = storage_service.intern_file(rel_path)
+        self.moved[rel_path] = new_path
+        return new_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate stored files to the content-addressed layout")
+    parser.add_argument("--dry-run", action="store_true", help="report what would move without changing anything")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if not settings.STORAGE_CONTENT_ADDRESSED and not args.dry_run:
+        sys.exit("Enable STORAGE_CONTENT_ADDRESSED first, so new files are written content-addressed too")
+
+    migrator = Migrator(args.dry_run)
+    db = SessionLocal()
+    try:
+        for user in db.query(User).order_by(User.id).all():
+            old_voice = user.voice_sample_path
+            changed = _migrate_columns(migrator, user, USER_COLUMNS)
+            if "voice_sample_path" in changed and not args.dry_run:
+                # Latents are cached next to the sample; they are rebuilt at the new path
+                delete_speaker_conditioning(old_voice)
+            if changed and not args.dry_run:
+                db.commit()
+                invalidate_user(user.id)
+
+            for reel in db.query(Reel).filter(Reel.user_id == user.id).order_by(Reel.id).all():
+                profile = reel.encode_profile or settings.DEFAULT_ENCODE_PROFILE
+                # Fingerprints embed the raw video path; remember which one was current
+                current = {
+                    p: _final_fingerprint(reel, user, p) for p in (profile, "draft")
+                }
+                final_profile = next((p for p, fp in current.items() if fp == reel.video_final_fingerprint), None)
+
+                if _migrate_columns(migrator, reel, REEL_COLUMNS) and not args.dry_run:
+                    if final_profile:
+                        reel.video_final_fingerprint = _final_fingerprint(reel, user, final_profile)
+                    db.commit()
+    finally:
+        db.close()
+
+    unique_bytes = sum(migrator.sizes.values())
+    verb = "Would move" if args.dry_run else "Moved"
+    print(
+        f"{verb} {migrator.files} files ({migrator.bytes_total} bytes); "
+        f"{len(migrator.sizes)} distinct, saving {migrator.bytes_total - unique_bytes} bytes"
+    )
+
+
+def _migrate_columns(migrator: Migrator, row, columns) -> list:
+    changed = []
+    for column in columns:
+        new_path = migrator.migrate(getattr(row, column))
+        if new_path:
+            if not migrator.dry_run:
+                setattr(row, column, new_path)
+            changed.append(column)
+    return changed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read once at import, so point them at throwaway locations first
+_tmp = tempfile.mkdtemp(prefix="reelgen-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("STORAGE_PATH", os.path.join(_tmp, "storage"))
+os.environ.setdefault("TTS_PRELOAD", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def session_factory():
+    """SessionLocal bound to a fresh schema, dropped again after the test."""
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    yield SessionLocal
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def user(session_factory):
+    from app.models import User
+
+    db = session_factory()
+    user = User(email="dr@example.com", hashed_password="x", full_name="Asha Rao")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+    return user
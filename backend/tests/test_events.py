@@ -0,0 +1,44 @@
+from app.services import events_service
+from app.services.events_service import EventBus, PostgresNotifyBackend
+
+
+class FakeConnection:
+    def __init__(self, broken: bool = False):
+        self.broken = broken
+        self.sent = []
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if self.broken:
+            raise ConnectionError("server closed the connection unexpectedly")
+        self.sent.append(params)
+
+    def close(self):
+        self.closed = True
+
+
+def test_notify_reuses_one_connection_outside_the_pool(monkeypatch):
+    connections = []
+    monkeypatch.setattr(events_service, "_connect", lambda: connections.append(FakeConnection()) or connections[-1])
+    backend = PostgresNotifyBackend()
+
+    for status in ("generating_audio", "generating_video"):
+        backend.publish(EventBus(backend), "user:1", {"status": status})
+
+    assert len(connections) == 1
+    assert [params[0] for params in connections[0].sent] == [events_service.PG_CHANNEL] * 2
+
+
+def test_notify_reconnects_after_the_connection_drops(monkeypatch):
+    connections = [FakeConnection(broken=True), FakeConnection()]
+    opened = iter(connections)
+    monkeypatch.setattr(events_service, "_connect", lambda: next(opened))
+    backend = PostgresNotifyBackend()
+
+    backend.publish(EventBus(backend), "user:1", {"status": "completed"})
+
+    assert connections[0].closed
+    assert len(connections[1].sent) == 1
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from app import worker as worker_module
+from app.models import Job
+from app.services import queue_service
+
+
+def _expire_lease(db, job_id):
+    stale = datetime.now(timezone.utc) - timedelta(seconds=queue_service.settings.JOB_LEASE_S + 60)
+    db.query(Job).filter(Job.id == job_id).update({Job.heartbeat_at: stale})
+    db.commit()
+
+
+def test_restarted_worker_does_not_renew_its_predecessors_leases(session_factory):
+    dead = worker_module.Worker(1, 0.1, session_factory)
+    restarted = worker_module.Worker(1, 0.1, session_factory)
+    assert dead.worker_id != restarted.worker_id
+
+    db = session_factory()
+    queue_service.enqueue(db, "script", payload={"fresh": True})
+    db.commit()
+    job = queue_service.claim_next(db, dead.worker_id)
+    _expire_lease(db, job.id)
+
+    assert queue_service.heartbeat(db, restarted.worker_id) == 0
+    assert queue_service.requeue_expired(db) == 1
+    db.expire_all()
+    assert db.get(Job, job.id).status == "queued"
+    db.close()
+
+
+def test_outcome_of_a_lost_lease_is_not_recorded(session_factory, monkeypatch):
+    slow = worker_module.Worker(1, 0.1, session_factory)
+    other = worker_module.Worker(1, 0.1, session_factory)
+    db = session_factory()
+    queue_service.enqueue(db, "script")
+    db.commit()
+    first = queue_service.claim_next(db, slow.worker_id)
+    job_id, attempt = first.id, first.attempts
+
+    def handler(reel_id, session_factory, **payload):
+        # Meanwhile the lease expires and another worker takes the job over
+        _expire_lease(db, job_id)
+        queue_service.requeue_expired(db)
+        queue_service.claim_next(db, other.worker_id)
+        raise RuntimeError("finished too late")
+
+    monkeypatch.setitem(worker_module.JOB_HANDLERS, "script", handler)
+    slow._slots.acquire()
+    slow._execute(job_id, attempt)
+
+    db.expire_all()
+    job = db.get(Job, job_id)
+    assert (job.status, job.locked_by, job.attempts, job.error_message) == ("running", other.worker_id, 2, None)
+
+    assert queue_service.complete(db, job_id, other.worker_id, 2)
+    db.expire_all()
+    assert db.get(Job, job_id).status == "done"
+    db.close()
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import worker as worker_module
+from app.models import WorkerStats
+from app.services import metrics_service, script_cache_service
+
+TOKEN = "metrics-secret"
+
+
+@pytest.fixture
+def client(monkeypatch, session_factory):
+    import main
+
+    monkeypatch.setattr(main.settings, "METRICS_TOKEN", TOKEN)
+    return TestClient(main.app)
+
+
+def test_endpoint_serves_stats_reported_by_workers(client, session_factory):
+    worker = worker_module.Worker(1, 0.1, session_factory)
+    db = session_factory()
+    metrics_service.report(db, worker.worker_id, worker.stats())
+    metrics_service.report(db, "gone:1:dead", {"tts": {}})
+    stale = datetime.now(timezone.utc) - timedelta(seconds=metrics_service.settings.JOB_LEASE_S + 60)
+    db.query(WorkerStats).filter(WorkerStats.worker_id == "gone:1:dead").update({WorkerStats.updated_at: stale})
+    db.commit()
+    db.close()
+
+    response = client.get("/api/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+
+    assert response.status_code == 200
+    workers = response.json()["workers"]
+    assert [w["worker_id"] for w in workers] == [worker.worker_id]
+    assert workers[0]["tts"]["requests"] == 0
+
+
+def test_endpoint_requires_the_token(client, monkeypatch):
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    monkeypatch.setattr(metrics_service.settings, "METRICS_TOKEN", "")
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+def test_script_cache_counters_come_from_the_worker(client, session_factory, user, monkeypatch):
+    monkeypatch.setattr(script_cache_service, "generate_script", lambda topic, language, on_delta=None: "Script")
+    monkeypatch.setattr(script_cache_service.settings, "SCRIPT_CACHE_ENABLED", True)
+    before = script_cache_service.stats()
+
+    # The lookups run in the worker, which reports them with its heartbeat
+    worker = worker_module.Worker(1, 0.1, session_factory)
+    db = session_factory()
+    for _ in range(2):
+        script_cache_service.get_or_generate_script(db, "Diabetes diet", "en", user.id)
+    metrics_service.report(db, worker.worker_id, worker.stats())
+    db.close()
+
+    body = client.get("/api/metrics", headers={"Authorization": f"Bearer {TOKEN}"}).json()
+
+    reported = body["workers"][0]["script_cache"]
+    assert (reported["hits"] - before["hits"], reported["misses"] - before["misses"]) == (1, 1)
+    assert body["script_cache"] == {"entries": 1, "hits": 1}
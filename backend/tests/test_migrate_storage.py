@@ -0,0 +1,22 @@
+import os
+
+from app.models import StoredObject
+from app.services import storage_service
+from scripts.migrate_storage_to_cas import Migrator
+
+
+def test_path_shared_by_two_rows_is_referenced_twice(session_factory, monkeypatch):
+    monkeypatch.setattr(storage_service.settings, "STORAGE_CONTENT_ADDRESSED", True)
+    legacy = os.path.join("uploads", "photos", "shared.jpg")
+    with open(storage_service.get_storage_path("uploads", "photos", "shared.jpg"), "wb") as f:
+        f.write(b"one photo, two rows")
+
+    migrator = Migrator(dry_run=False)
+    first = migrator.migrate(legacy)
+    second = migrator.migrate(legacy)
+
+    assert first == second and storage_service.is_content_addressed(first)
+    assert not storage_service.file_exists(legacy)
+    db = session_factory()
+    assert db.query(StoredObject).one().refcount == 2
+    db.close()
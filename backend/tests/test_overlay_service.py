@@ -0,0 +1,27 @@
+import os
+
+from app.services import overlay_service
+
+
+def _age(path: str, seconds: float) -> None:
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+def test_cache_keeps_the_most_recently_used_overlays(monkeypatch):
+    monkeypatch.setattr(overlay_service.settings, "OVERLAY_CACHE_MAX_FILES", 2)
+    cache_dir = os.path.join(overlay_service.settings.STORAGE_PATH, "cache", "overlays")
+    for name in os.listdir(cache_dir) if os.path.isdir(cache_dir) else ():
+        os.remove(os.path.join(cache_dir, name))
+
+    reused = overlay_service.render_overlay("Diabetes diet", "Asha Rao")
+    evicted = overlay_service.render_overlay("Heart health", "Asha Rao")
+    _age(reused, 20)
+    _age(evicted, 10)
+    # A cache hit marks the overlay as recently used again
+    assert overlay_service.render_overlay("Diabetes diet", "Asha Rao") == reused
+
+    kept = overlay_service.render_overlay("Sleep hygiene", "Asha Rao")
+
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(p) for p in (reused, kept))
+    assert not os.path.exists(evicted)
@@ -0,0 +1,32 @@
+from PIL import Image
+
+from app.services import photo_service, storage_service
+
+
+def _upload(width: int, height: int) -> str:
+    rel_path = "uploads/photos/phone.jpg"
+    Image.new("RGB", (width, height), "white").save(storage_service.get_storage_path(rel_path), "JPEG")
+    return rel_path
+
+
+def _normalized_size(rel_path: str):
+    with Image.open(storage_service.local_path(rel_path)) as img:
+        return img.size
+
+
+def test_photo_without_a_detected_face_is_only_downscaled(monkeypatch):
+    monkeypatch.setattr(photo_service, "_detect_face_center", lambda img: None)
+
+    normalized = photo_service.normalize_photo(_upload(4032, 3024))
+
+    assert _normalized_size(normalized) == (1024, 768)
+
+
+def test_photo_is_cropped_around_a_detected_face(monkeypatch):
+    # Face near the right edge of a landscape phone photo
+    monkeypatch.setattr(photo_service, "_detect_face_center", lambda img: (3600, 1200))
+
+    normalized = photo_service.normalize_photo(_upload(4032, 3024))
+
+    width, height = _normalized_size(normalized)
+    assert height == 1024 and abs(width / height - 9 / 16) < 0.01
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Reel, User
+from app.services import pipeline_service, storage_service
+
+REELS = 50
+STAGE_S = 0.2
+
+
+def _stored(*parts) -> str:
+    with open(storage_service.get_storage_path(*parts), "wb") as f:
+        f.write(parts[-1].encode())
+    return "/".join(parts)
+
+
+def test_concurrent_pipelines_fit_a_small_pool(tmp_path, monkeypatch):
+    # Far fewer connections than pipelines: stages must not hold one while they run
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db", connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=5, max_overflow=0, pool_timeout=5,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    audio = _stored("generated", "audio", "take.wav")
+    raw = _stored("generated", "video_raw", "raw.mp4")
+    final = _stored("generated", "video_final", "final.mp4")
+
+    def slow(result):
+        def stage(*args, on_progress=None, **kwargs):
+            for step in range(4):
+                time.sleep(STAGE_S / 4)
+                if on_progress:
+                    on_progress(25.0 * step, 1.0)
+            return result
+        return stage
+
+    monkeypatch.setattr(pipeline_service, "generate_tts_audio", slow(audio))
+    monkeypatch.setattr(pipeline_service, "generate_lipsync_video", slow(raw))
+    monkeypatch.setattr(pipeline_service, "post_process_video", slow((final, 30.0)))
+    monkeypatch.setattr(pipeline_service, "delete_outputs", lambda *paths: None)
+    monkeypatch.setattr(pipeline_service.settings, "DRAFT_FIRST_ENCODE", False)
+    monkeypatch.setattr(pipeline_service, "_cpu_slots", threading.BoundedSemaphore(REELS))
+
+    db = session_factory()
+    user = User(
+        email="dr@example.com", hashed_password="x", full_name="Asha Rao", is_onboarded=True,
+        photo_path=_stored("uploads", "photos", "me.jpg"),
+        voice_sample_path=_stored("uploads", "voice_samples", "me.wav"),
+    )
+    db.add(user)
+    db.flush()
+    reels = [
+        Reel(user_id=user.id, topic=f"Topic {i}", script_text="Drink water.", status="script_ready")
+        for i in range(REELS)
+    ]
+    db.add_all(reels)
+    db.commit()
+    reel_ids = [reel.id for reel in reels]
+    db.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=REELS) as pool:
+            # result() re-raises anything a pipeline raised, including pool TimeoutErrors
+            for future in [pool.submit(pipeline_service.run_full_pipeline, i, session_factory) for i in reel_ids]:
+                future.result()
+
+        db = session_factory()
+        assert {reel.status for reel in db.query(Reel).all()} == {"completed"}
+        db.close()
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_waiting_on_lipsync_holds_no_cpu_slot(session_factory, user, monkeypatch):
+    audio = _stored("generated", "audio", "take.wav")
+    raw = _stored("generated", "video_raw", "raw.mp4")
+    final = _stored("generated", "video_final", "final.mp4")
+    in_lipsync, release = threading.Event(), threading.Event()
+
+    def lipsync(*args):
+        if not in_lipsync.is_set():
+            in_lipsync.set()
+            release.wait(10)
+        return raw
+
+    monkeypatch.setattr(pipeline_service, "_cpu_slots", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(pipeline_service.settings, "TTS_BACKEND", "local")
+    monkeypatch.setattr(pipeline_service.settings, "DRAFT_FIRST_ENCODE", False)
+    monkeypatch.setattr(pipeline_service, "generate_tts_audio", lambda *args: audio)
+    monkeypatch.setattr(pipeline_service, "generate_lipsync_video", lipsync)
+    monkeypatch.setattr(pipeline_service, "post_process_video", lambda *args, **kwargs: (final, 30.0))
+    monkeypatch.setattr(pipeline_service, "delete_outputs", lambda *paths: None)
+
+    db = session_factory()
+    db.query(User).filter(User.id == user.id).update({
+        "is_onboarded": True,
+        "photo_path": _stored("uploads", "photos", "me.jpg"),
+        "voice_sample_path": _stored("uploads", "voice_samples", "me.wav"),
+    })
+    reels = [Reel(user_id=user.id, topic=f"Topic {i}", script_text="Drink water.", status="script_ready") for i in range(2)]
+    db.add_all(reels)
+    db.commit()
+    waiting_id, other_id = [reel.id for reel in reels]
+    db.close()
+
+    waiting = threading.Thread(target=pipeline_service.run_full_pipeline, args=(waiting_id, session_factory))
+    waiting.start()
+    try:
+        assert in_lipsync.wait(5)
+        # With the only CPU slot free, the other reel's TTS and encode run to completion
+        other = threading.Thread(target=pipeline_service.run_full_pipeline, args=(other_id, session_factory))
+        other.start()
+        other.join(5)
+        assert not other.is_alive()
+    finally:
+        release.set()
+        waiting.join(5)
+
+    db = session_factory()
+    assert {reel.status for reel in db.query(Reel).all()} == {"completed"}
+    db.close()
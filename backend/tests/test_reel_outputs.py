@@ -0,0 +1,95 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models import Reel, StoredObject
+from app.services import pipeline_service, storage_service
+from app.services.auth_service import create_access_token
+
+
+@pytest.fixture
+def cas(monkeypatch):
+    monkeypatch.setattr(storage_service.settings, "STORAGE_CONTENT_ADDRESSED", True)
+
+
+def _store(name: str, content: bytes) -> str:
+    path = storage_service.get_storage_path("generated", "audio", name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return storage_service.put_file(path, os.path.join("generated", "audio", name))
+
+
+def _refcounts(session_factory) -> dict:
+    db = session_factory()
+    try:
+        return {obj.rel_path: obj.refcount for obj in db.query(StoredObject).all()}
+    finally:
+        db.close()
+
+
+def _add_reel(session_factory, user, **fields) -> Reel:
+    db = session_factory()
+    reel = Reel(user_id=user.id, topic="Diabetes diet", status="completed", **fields)
+    db.add(reel)
+    db.commit()
+    db.refresh(reel)
+    db.expunge(reel)
+    db.close()
+    return reel
+
+
+def test_replaced_stage_output_is_released(session_factory, user, cas):
+    old_audio = _store("old.wav", b"old take")
+    reel = _add_reel(session_factory, user, audio_path=old_audio)
+
+    new_audio = _store("new.wav", b"new take")
+    pipeline_service._save(session_factory, reel, audio_path=new_audio)
+
+    assert _refcounts(session_factory) == {new_audio: 1}
+    assert not storage_service.file_exists(old_audio)
+
+
+def test_regenerating_identical_output_keeps_one_reference(session_factory, user, cas):
+    audio = _store("a.wav", b"same take")
+    reel = _add_reel(session_factory, user, audio_path=audio)
+
+    again = _store("b.wav", b"same take")
+    pipeline_service._save(session_factory, reel, audio_path=again)
+
+    assert again == audio
+    assert _refcounts(session_factory) == {audio: 1}
+    assert storage_service.file_exists(audio)
+
+
+def test_outputs_for_a_deleted_reel_are_released(session_factory, user, cas):
+    reel = _add_reel(session_factory, user)
+    db = session_factory()
+    db.query(Reel).filter(Reel.id == reel.id).delete()
+    db.commit()
+    db.close()
+
+    audio = _store("late.wav", b"finished after delete")
+    pipeline_service._save(session_factory, reel, audio_path=audio)
+
+    assert _refcounts(session_factory) == {}
+    assert not storage_service.file_exists(audio)
+
+
+def test_deleting_a_reel_releases_its_files(session_factory, user, cas):
+    import main
+
+    shared = _store("shared.wav", b"used by two reels")
+    _store("shared2.wav", b"used by two reels")
+    raw = _store("raw.mp4", b"raw video")
+    final = _store("final.mp4", b"final video")
+    reel = _add_reel(session_factory, user, audio_path=shared, video_raw_path=raw, video_final_path=final)
+    _add_reel(session_factory, user, audio_path=shared)
+
+    token = create_access_token(data={"sub": str(user.id)})
+    response = TestClient(main.app).delete(f"/api/reels/{reel.id}", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 204
+    assert _refcounts(session_factory) == {shared: 1}
+    assert storage_service.file_exists(shared)
+    assert not storage_service.file_exists(raw) and not storage_service.file_exists(final)
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import replicate_client
+from app.services.replicate_client import ReplicateClient, verify_webhook
+from app.utils.aio import run_sync
+
+API_BASE = "https://replicate.test/v1"
+SECRET = "whsec_" + base64.b64encode(b"test-webhook-secret").decode()
+OUTPUT_URL = "https://replicate.delivery/out.mp4"
+
+
+class FakeReplicate:
+    """In-memory stand-in for the Replicate HTTP API."""
+
+    def __init__(self, polls_until_done: int = 2, on_create=None, throttle: tuple = ()):
+        self.polls_until_done = polls_until_done
+        self.on_create = on_create
+        self.throttle = set(throttle)  # endpoints that answer 429 to their first request
+        self.created = []
+        self.polls = 0
+        self.uploads = 0
+        self.auth = {}  # host -> Authorization header of the last request to it
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        endpoint = f"{request.method} {path}"
+        self.auth[request.url.host] = request.headers.get("authorization")
+        if str(request.url) == OUTPUT_URL:
+            return httpx.Response(200, content=b"video bytes")
+        if endpoint in self.throttle:
+            self.throttle.discard(endpoint)
+            return httpx.Response(429, headers={"retry-after": "0.01"}, json={"detail": "throttled"})
+        if request.method == "POST" and path == "/v1/files":
+            self.uploads += 1
+            return httpx.Response(201, json={"urls": {"get": f"{API_BASE}/files/f{self.uploads}"}})
+        if request.method == "POST" and path == "/v1/predictions":
+            self.created.append(json.loads(request.content))
+            if self.on_create:
+                self.on_create()
+            return httpx.Response(201, json={"id": "p1", "status": "starting"})
+        if request.method == "GET" and path == "/v1/predictions/p1":
+            self.polls += 1
+            if self.polls < self.polls_until_done:
+                return httpx.Response(200, json={"id": "p1", "status": "processing"})
+            return httpx.Response(200, json={"id": "p1", "status": "succeeded", "output": OUTPUT_URL})
+        return httpx.Response(404, json={"detail": "not found"})
+
+
+def make_client(fake: FakeReplicate, webhook_url: str = "") -> ReplicateClient:
+    client = ReplicateClient(API_BASE, "r8_test", webhook_url)
+    client._http = httpx.AsyncClient(base_url=API_BASE, transport=httpx.MockTransport(fake.handler))
+    return client
+
+
+def sign(body: bytes, msg_id: str = "msg_1", timestamp: int = None) -> dict:
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    key = base64.b64decode(SECRET.split("_", 1)[-1])
+    digest = hmac.new(key, f"{msg_id}.{timestamp}.".encode() + body, hashlib.sha256).digest()
+    return {
+        "webhook-id": msg_id,
+        "webhook-timestamp": timestamp,
+        "webhook-signature": f"v1,{base64.b64encode(digest).decode()}",
+    }
+
+
+@pytest.fixture
+def webhooks(monkeypatch):
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_WEBHOOK_URL", "https://app.test/api/webhooks/replicate")
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_WEBHOOK_SECRET", SECRET)
+
+
+def test_run_uploads_files_and_polls_to_completion(monkeypatch, tmp_path):
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_POLL_INTERVAL_S", 0.01)
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"jpeg")
+    fake = FakeReplicate(polls_until_done=3)
+
+    output = run_sync(make_client(fake).run("owner/model:v1", {"steps": 25}, files={"image": str(photo)}), timeout=10)
+
+    assert output == OUTPUT_URL
+    assert fake.polls == 3
+    assert fake.created == [{"version": "v1", "input": {"steps": 25, "image": f"{API_BASE}/files/f1"}}]
+
+
+def test_throttled_uploads_and_polls_are_retried(monkeypatch, tmp_path):
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_POLL_INTERVAL_S", 0.01)
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"jpeg")
+    fake = FakeReplicate(throttle=("POST /v1/files", "GET /v1/predictions/p1"))
+
+    output = run_sync(make_client(fake).run("owner/model:v1", {}, files={"image": str(photo)}), timeout=10)
+
+    assert output == OUTPUT_URL
+    assert fake.throttle == set()
+    assert fake.uploads == 1
+
+
+def test_webhook_completes_prediction_without_polling(monkeypatch, webhooks):
+    # The safety-net poll would only fire after 10x this interval
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_POLL_INTERVAL_S", 5)
+    holder = {}
+
+    def deliver_soon():
+        done = {"id": "p1", "status": "succeeded", "output": OUTPUT_URL}
+        threading.Timer(0.05, lambda: holder["client"].deliver_webhook(done)).start()
+
+    fake = FakeReplicate(on_create=deliver_soon)
+    holder["client"] = make_client(fake, webhook_url=replicate_client.settings.REPLICATE_WEBHOOK_URL)
+
+    started = time.monotonic()
+    output = run_sync(holder["client"].run("owner/model:v1", {}), timeout=10)
+
+    assert output == OUTPUT_URL
+    assert time.monotonic() - started < 5
+    assert fake.polls == 0
+    assert fake.created[0]["webhook"] == replicate_client.settings.REPLICATE_WEBHOOK_URL
+
+
+def test_outputs_download_over_the_api_client_without_the_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_POLL_INTERVAL_S", 0.01)
+    fake = FakeReplicate()
+    client = make_client(fake)
+    dest = tmp_path / "out.mp4"
+
+    output = run_sync(client.run("owner/model:v1", {}), timeout=10)
+    written = run_sync(client.download(output, str(dest), timeout=10), timeout=10)
+
+    assert written == len(b"video bytes") and dest.read_bytes() == b"video bytes"
+    assert fake.auth == {"replicate.test": "Bearer r8_test", "replicate.delivery": None}
+
+
+def test_client_without_webhooks_ignores_deliveries():
+    client = make_client(FakeReplicate())
+    client._waiters["p1"] = object()
+    assert client.deliver_webhook({"id": "p1", "status": "succeeded", "output": "https://evil.test/x"}) is False
+
+
+def test_verify_webhook_requires_a_secret():
+    body = b'{"id": "p1"}'
+    assert verify_webhook(body, sign(body)) is False
+
+
+def test_verify_webhook_checks_signature_and_age(webhooks):
+    body = b'{"id": "p1", "status": "succeeded"}'
+    assert verify_webhook(body, sign(body)) is True
+    assert verify_webhook(b'{"id": "p1", "status": "failed"}', sign(body)) is False
+    assert verify_webhook(body, sign(body, timestamp=int(time.time()) - 3600)) is False
+    assert verify_webhook(body, {}) is False
+
+
+def test_webhook_endpoint_is_disabled_without_secret(monkeypatch):
+    import main
+
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_WEBHOOK_URL", "https://app.test/api/webhooks/replicate")
+    monkeypatch.setattr(replicate_client.settings, "REPLICATE_WEBHOOK_SECRET", "")
+    delivered = []
+    monkeypatch.setattr(replicate_client.get_client(), "deliver_webhook", delivered.append)
+
+    response = TestClient(main.app).post("/api/webhooks/replicate", json={"id": "p1", "output": "https://evil.test/x"})
+
+    assert response.status_code == 404
+    assert delivered == []
+
+
+def test_webhook_endpoint_rejects_bad_signatures(monkeypatch, webhooks):
+    import main
+
+    delivered = []
+    monkeypatch.setattr(replicate_client.get_client(), "deliver_webhook", delivered.append)
+    client = TestClient(main.app)
+    body = json.dumps({"id": "p1", "status": "succeeded", "output": OUTPUT_URL}).encode()
+
+    forged = client.post("/api/webhooks/replicate", content=body, headers={**sign(b"other"), "content-type": "application/json"})
+    assert forged.status_code == 403
+    assert delivered == []
+
+    signed = client.post("/api/webhooks/replicate", content=body, headers={**sign(body), "content-type": "application/json"})
+    assert signed.status_code == 204
+    assert delivered == [json.loads(body)]
@@ -0,0 +1,113 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import Reel, User
+from app.services.user_cache import invalidate_user
+
+
+def _sync_app(monkeypatch) -> FastAPI:
+    from app.routers import auth, reels, users
+
+    return _app(auth, users, reels)
+
+
+def _async_app(monkeypatch) -> FastAPI:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app import database
+    from app.middleware import auth as auth_middleware
+    from app.routers.aio import auth, reels, users
+
+    url, kwargs = database._async_engine_args(database.settings.DATABASE_URL)
+    session_factory = async_sessionmaker(create_async_engine(url, **kwargs), autoflush=False, expire_on_commit=False)
+    monkeypatch.setattr(auth_middleware, "AsyncSessionLocal", session_factory)
+
+    async def get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app = _app(auth, users, reels)
+    app.dependency_overrides[database.get_async_db] = get_async_db
+    return app
+
+
+def _app(auth, users, reels) -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+    app.include_router(users.router, prefix="/api/users")
+    app.include_router(reels.router, prefix="/api/reels")
+    return app
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, session_factory, monkeypatch):
+    build = _sync_app if request.param == "sync" else _async_app
+    with TestClient(build(monkeypatch)) as client:
+        yield client
+    # Ids restart with the next test's schema; don't serve this test's users to it
+    db = session_factory()
+    for (user_id,) in db.query(User.id).all():
+        invalidate_user(user_id)
+    db.close()
+
+
+def _update(session_factory, model, row_id, **fields):
+    db = session_factory()
+    db.query(model).filter(model.id == row_id).update(fields)
+    db.commit()
+    db.close()
+
+
+def test_auth_flow(client):
+    signup = {"email": "dr@example.com", "password": "s3cret-pass", "full_name": "Asha Rao"}
+    tokens = client.post("/api/auth/signup", json=signup).json()
+
+    duplicate = client.post("/api/auth/signup", json=signup)
+    assert duplicate.status_code == 400 and duplicate.json()["detail"] == "Email already registered"
+
+    wrong = client.post("/api/auth/login", json={"email": "dr@example.com", "password": "nope-nope"})
+    assert wrong.status_code == 401 and wrong.json()["detail"] == "Invalid email or password"
+    assert client.post("/api/auth/login", json={"email": "dr@example.com", "password": "s3cret-pass"}).status_code == 200
+
+    not_refresh = client.post("/api/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    assert not_refresh.status_code == 401 and not_refresh.json()["detail"] == "Invalid refresh token"
+    assert client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+
+
+def test_profile_and_reel_flow(client, session_factory):
+    tokens = client.post(
+        "/api/auth/signup", json={"email": "dr@example.com", "password": "s3cret-pass", "full_name": "Asha Rao"},
+    ).json()
+    client.headers["Authorization"] = f"Bearer {tokens['access_token']}"
+
+    profile = client.put("/api/users/me", json={"specialization": "Cardiology"}).json()
+    assert profile["specialization"] == "Cardiology" and profile["full_name"] == "Asha Rao"
+
+    not_onboarded = client.post("/api/reels/", json={"topic": "Heart health"})
+    assert not_onboarded.status_code == 400
+
+    _update(session_factory, User, profile["id"], is_onboarded=True)
+    invalidate_user(profile["id"])
+
+    batch = client.post("/api/reels/batch", json={"items": [{"topic": "Heart health"}, {"topic": "x"}]}).json()
+    assert (batch["succeeded"], batch["failed"]) == (1, 1)
+    assert batch["results"][1]["error"].startswith("topic:")
+    reel_id = batch["results"][0]["reel"]["id"]
+
+    assert client.put(f"/api/reels/{reel_id}/script", json={"script_text": "Walk daily."}).status_code == 400
+    assert client.post(f"/api/reels/{reel_id}/generate").status_code == 400
+    _update(session_factory, Reel, reel_id, status="script_ready")
+    assert client.put(f"/api/reels/{reel_id}/script", json={"script_text": "Walk daily."}).status_code == 200
+
+    generated = client.post("/api/reels/batch/generate", json={"reel_ids": [reel_id, 999]}).json()
+    assert (generated["succeeded"], generated["failed"]) == (1, 1)
+    assert generated["results"][0]["reel"]["status"] == "generating_audio"
+    assert generated["results"][1]["error"] == "Reel not found"
+
+    reel = client.get(f"/api/reels/{reel_id}").json()
+    assert reel["script_text"] == "Walk daily." and reel["status"] == "generating_audio"
+    assert client.get(f"/api/reels/{reel_id}/download").status_code == 400
+    assert client.get("/api/reels/999").status_code == 404
+    assert client.delete(f"/api/reels/{reel_id}").status_code == 204
+    assert client.get(f"/api/reels/{reel_id}").status_code == 404
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import Job, Reel
+from app.services import pipeline_service, queue_service
+
+
+def _add_reels(session_factory, user, statuses):
+    db = session_factory()
+    reels = [Reel(user_id=user.id, topic=f"Topic {i}", status=status) for i, status in enumerate(statuses)]
+    db.add_all(reels)
+    db.commit()
+    ids = [reel.id for reel in reels]
+    db.close()
+    return ids
+
+
+def _statuses(session_factory, reel_ids):
+    db = session_factory()
+    try:
+        return [db.get(Reel, reel_id).status for reel_id in reel_ids]
+    finally:
+        db.close()
+
+
+def test_exhausted_batch_job_fails_its_unfinished_reels(session_factory, user):
+    reel_ids = _add_reels(session_factory, user, ["generating_script", "pending", "script_ready"])
+    db = session_factory()
+    job = queue_service.enqueue(db, "script_batch", payload={"reel_ids": reel_ids})
+    job.status = "running"
+    job.attempts = queue_service.settings.JOB_MAX_ATTEMPTS
+    job.heartbeat_at = datetime.now(timezone.utc) - timedelta(seconds=queue_service.settings.JOB_LEASE_S + 60)
+    db.commit()
+
+    assert queue_service.requeue_expired(db) == 1
+    db.close()
+
+    assert _statuses(session_factory, reel_ids) == ["failed", "failed", "script_ready"]
+    db = session_factory()
+    assert db.query(Job).one().status == "failed"
+    db.close()
+
+
+def test_rerun_batch_keeps_finished_scripts(session_factory, user, monkeypatch):
+    generated = []
+
+    def fake_script(db, topic, language, user_id, fresh=False, on_delta=None):
+        generated.append(topic)
+        return f"A fresh script about {topic}."
+
+    monkeypatch.setattr(pipeline_service, "get_or_generate_script", fake_script)
+    reel_ids = _add_reels(session_factory, user, ["pending", "script_ready"])
+    db = session_factory()
+    edited = db.get(Reel, reel_ids[1])
+    edited.script_text = "Edited by the doctor."
+    db.commit()
+    db.close()
+
+    pipeline_service.run_batch_script_generation(None, session_factory, reel_ids)
+
+    assert generated == ["Topic 0"]
+    assert _statuses(session_factory, reel_ids) == ["script_ready", "script_ready"]
+    db = session_factory()
+    assert db.get(Reel, reel_ids[1]).script_text == "Edited by the doctor."
+    db.close()
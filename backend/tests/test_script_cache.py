@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models import ScriptCache
+from app.services import script_cache_service
+
+
+def test_expired_entry_is_refreshed_in_place(session_factory, monkeypatch):
+    scripts = iter(["First take on hydration.", "Second take on hydration."])
+    monkeypatch.setattr(script_cache_service, "generate_script", lambda topic, language, on_delta=None: next(scripts))
+    monkeypatch.setattr(script_cache_service.settings, "SCRIPT_CACHE_ENABLED", True)
+    db = session_factory()
+
+    assert script_cache_service.get_or_generate_script(db, "Hydration", "en", user_id=1) == "First take on hydration."
+    entry = db.query(ScriptCache).one()
+    entry.created_at = datetime.now(timezone.utc) - timedelta(hours=script_cache_service.settings.SCRIPT_CACHE_TTL_HOURS + 1)
+    entry.hits = 4
+    db.commit()
+
+    assert script_cache_service.get_or_generate_script(db, "Hydration", "en", user_id=1) == "Second take on hydration."
+    db.expire_all()
+    entry = db.query(ScriptCache).one()
+    assert entry.script_text == "Second take on hydration."
+    assert entry.hits == 0
+
+    # Served from the refreshed entry, not regenerated
+    assert script_cache_service.get_or_generate_script(db, "Hydration", "en", user_id=1) == "Second take on hydration."
+    db.close()
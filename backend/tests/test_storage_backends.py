@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from app.services import storage_backends  # noqa: E402
+from app.services.storage_backends import CACHE_MIN_AGE_S, S3Backend  # noqa: E402
+
+MB = 1024 * 1024
+BUCKET = "reelgen-media"
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_backends.settings, "S3_ENDPOINT_URL", "")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    with moto.mock_aws():
+        backend = S3Backend(BUCKET, str(tmp_path), cache_max_mb=3)
+        backend.client.create_bucket(Bucket=BUCKET)
+        yield backend
+
+
+def _put(backend, key: str, size: int, age_s: float = 0) -> str:
+    src = os.path.join(backend.cache_root, "scratch.bin")
+    with open(src, "wb") as f:
+        f.write(b"\0" * size)
+    backend.put_file(src, key)
+    cached = backend._cache_path(key)
+    if age_s:
+        then = time.time() - age_s
+        os.utime(cached, (then, then))
+    return cached
+
+
+def test_least_recently_used_copies_are_evicted(backend):
+    old = _put(backend, "uploads/photos/old.jpg", MB, age_s=CACHE_MIN_AGE_S + 300)
+    used = _put(backend, "uploads/voice_samples/used.wav", MB, age_s=CACHE_MIN_AGE_S + 200)
+    _put(backend, "generated/audio/mid.wav", MB, age_s=CACHE_MIN_AGE_S + 100)
+    # Reading a copy marks it as recently used
+    backend.local_path("uploads/voice_samples/used.wav")
+    _put(backend, "generated/video_raw/new.mp4", MB)
+
+    assert not os.path.exists(old)
+    assert os.path.exists(used)
+    # Evicted copies are fetched again on demand
+    assert os.path.getsize(backend.local_path("uploads/photos/old.jpg")) == MB
+
+
+def test_recently_used_copies_and_scratch_files_are_kept(backend):
+    scratch = os.path.join(backend.cache_root, "tmp", "uploads", "staged.bin")
+    os.makedirs(os.path.dirname(scratch))
+    with open(scratch, "wb") as f:
+        f.write(b"\0" * MB)
+    old = time.time() - CACHE_MIN_AGE_S - 100
+    os.utime(scratch, (old, old))
+
+    recent = [_put(backend, f"generated/video_final/{i}.mp4", MB) for i in range(5)]
+
+    assert backend.trim_cache() == 0
+    assert all(os.path.exists(path) for path in recent + [scratch])
@@ -0,0 +1,40 @@
+from app.services import storage_service, tts_service
+
+SCRIPT = "Drink water before meals. Walk after dinner. Sleep seven hours."
+
+
+def _voice_sample() -> str:
+    path = storage_service.get_storage_path("uploads", "voice_samples", "me.wav")
+    with open(path, "wb") as f:
+        f.write(b"voice")
+    return "uploads/voice_samples/me.wav"
+
+
+def _record(calls: list):
+    def synthesize(text, voice_path, output_path, language, conditioning_path=None):
+        calls.append(text)
+        tts_service._generate_placeholder(output_path, text)
+    return synthesize
+
+
+def test_local_backend_synthesizes_the_script_in_one_request(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tts_service.settings, "TTS_BACKEND", "local")
+    monkeypatch.setattr(tts_service.settings, "TTS_SEGMENT_MAX_CHARS", 30)
+    monkeypatch.setattr(tts_service, "_generate_local", _record(calls))
+
+    tts_service.generate_tts_audio(SCRIPT, _voice_sample())
+
+    assert calls == [SCRIPT]
+
+
+def test_replicate_backend_splits_long_scripts_into_segments(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tts_service.settings, "TTS_BACKEND", "replicate")
+    monkeypatch.setattr(tts_service.settings, "TTS_SEGMENT_MAX_CHARS", 30)
+    monkeypatch.setattr(tts_service, "_generate_via_replicate", _record(calls))
+
+    output = tts_service.generate_tts_audio(SCRIPT, _voice_sample())
+
+    assert sorted(calls) == sorted(["Drink water before meals.", "Walk after dinner.", "Sleep seven hours."])
+    assert storage_service.file_exists(output)
@@ -0,0 +1,78 @@
+import asyncio
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.middleware.upload_limit import FRAMING_SLACK_BYTES, UploadLimitMiddleware
+
+MB = 1024 * 1024
+BOUNDARY = "testboundary"
+
+
+def make_app(calls: list) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, limits_mb={"/upload": 1})
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def multipart_chunks(size: int) -> list:
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.bin\"\r\n"
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    return [head] + [b"\0" * (64 * 1024)] * (size // (64 * 1024)) + [f"\r\n--{BOUNDARY}--\r\n".encode()]
+
+
+def post_streamed(app: FastAPI, size: int):
+    """POST a chunked body straight through ASGI; returns (status, bytes the app pulled)."""
+    chunks = multipart_chunks(size)
+    pulled = []
+    sent = []
+
+    async def receive():
+        if len(pulled) < len(chunks):
+            pulled.append(chunks[len(pulled)])
+            return {"type": "http.request", "body": pulled[-1], "more_body": len(pulled) < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http", "path": "/upload",
+        "raw_path": b"/upload", "root_path": "", "query_string": b"", "server": ("test", 80), "client": ("test", 1),
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], sum(len(chunk) for chunk in pulled)
+
+
+def test_small_upload_passes():
+    calls = []
+    status_code, _ = post_streamed(make_app(calls), MB // 2)
+    assert status_code == 200
+    assert calls == ["a.bin"]
+
+
+def test_streamed_upload_is_cut_off_at_the_cap():
+    calls = []
+    status_code, pulled = post_streamed(make_app(calls), 8 * MB)
+
+    assert status_code == 413
+    assert calls == []
+    # Reading stopped right after the cap instead of consuming all 8 MB
+    assert pulled <= MB + FRAMING_SLACK_BYTES + 64 * 1024
+
+
+def test_declared_length_over_cap_is_refused_unread():
+    calls = []
+    response = TestClient(make_app(calls)).post("/upload", files={"file": ("a.bin", b"\0" * (3 * MB))})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "File too large (max 1MB)"}
+    assert calls == []
@@ -0,0 +1,79 @@
+import shutil
+import subprocess
+
+import pytest
+
+from app.services import storage_service, video_service
+
+pytestmark = pytest.mark.skipif(not shutil.which("ffmpeg"), reason="needs ffmpeg")
+
+
+def _raw_video(name: str, audio_codec: str) -> str:
+    rel_path = f"generated/video_raw/{name}"
+    subprocess.run(
+        [
+            "ffmpeg", "-y", "-v", "error",
+            "-f", "lavfi", "-i", "testsrc=size=320x240:rate=25:duration=2",
+            "-f", "lavfi", "-i", "sine=duration=2",
+            "-c:v", "libx264", "-preset", "ultrafast", "-c:a", audio_codec,
+            storage_service.get_storage_path(rel_path),
+        ],
+        check=True,
+    )
+    return rel_path
+
+
+@pytest.fixture
+def launches(monkeypatch):
+    """FFmpeg processes started by video_service."""
+    started = []
+    popen = subprocess.Popen
+
+    def spy(cmd, **kwargs):
+        process = popen(cmd, **kwargs)
+        if "-progress" in cmd:
+            started.append(process)
+        return process
+
+    monkeypatch.setattr(video_service.subprocess, "Popen", spy)
+    return started
+
+
+def _audio_codec(rel_path: str) -> str:
+    header = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-i", storage_service.local_path(rel_path)], capture_output=True, text=True,
+    ).stderr
+    return next(match.group(1) for line in header.splitlines() if (match := video_service.AUDIO_STREAM_RE.match(line)))
+
+
+def test_aac_audio_is_copied_in_a_single_run(launches):
+    progress = []
+    rel_path, duration = video_service.post_process_video(
+        _raw_video("aac.mp4", "aac"), "Asha Rao", "Hydration", profile="draft",
+        on_progress=lambda percent, eta: progress.append(percent),
+    )
+
+    assert len(launches) == 1
+    assert duration == pytest.approx(2.0, abs=0.1)
+    assert progress and progress[-1] == pytest.approx(100.0, abs=5)
+    assert _audio_codec(rel_path) == "aac"
+
+
+def test_other_audio_is_reencoded(launches):
+    rel_path, duration = video_service.post_process_video(
+        _raw_video("pcm.mov", "pcm_s16le"), "Asha Rao", "Hydration", profile="draft",
+    )
+
+    assert len(launches) == 2
+    assert duration == pytest.approx(2.0, abs=0.1)
+    assert _audio_codec(rel_path) == "aac"
+
+
+def test_failing_progress_callback_stops_ffmpeg(launches):
+    def on_progress(percent, eta):
+        raise RuntimeError("database went away")
+
+    with pytest.raises(RuntimeError, match="database went away"):
+        video_service.post_process_video(_raw_video("cb.mp4", "aac"), "Asha Rao", "Hydration", on_progress=on_progress)
+
+    assert launches[0].returncode is not None
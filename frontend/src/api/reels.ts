@@ -4,8 +4,10 @@ import type { Reel, ReelList, ReelCreate, ScriptUpdate } from '../types';
 export const reelsApi = {
   create: (data: ReelCreate) => api.post<Reel>('/reels/', data),
 
-  list: (page: number = 1, perPage: number = 10) =>
-    api.get<ReelList>('/reels/', { params: { page, per_page: perPage } }),
+  list: (cursor: string | null = null, perPage: number = 10) =>
+    api.get<ReelList>('/reels/', {
+      params: { cursor: cursor ?? undefined, per_page: perPage, include_total: cursor === null },
+    }),
 
   get: (id: number) => api.get<Reel>(`/reels/${id}`),
 
@@ -14,6 +16,11 @@ export const reelsApi = {
 
   generate: (id: number) => api.post<Reel>(`/reels/${id}/generate`),
 
+  eventsUrl: (id: number) => {
+    const token = localStorage.getItem('access_token') ?? '';
+    return `/api/reels/events?reel_id=${id}&token=${encodeURIComponent(token)}`;
+  },
+
   getDownloadUrl: (id: number) => `/api/reels/${id}/download`,
 
   download: (id: number) => api.get<Blob>(`/reels/${id}/download`, { responseType: 'blob' }),
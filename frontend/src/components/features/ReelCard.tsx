@@ -1,9 +1,9 @@
 import { Link } from 'react-router-dom';
-import type { Reel } from '../../types';
+import type { ReelSummary } from '../../types';
 import { Clock, CheckCircle, AlertCircle, Loader2 } from 'lucide-react';
 
 interface ReelCardProps {
-  reel: Reel;
+  reel: ReelSummary;
 }
 
 const STATUS_CONFIG: Record<string, { label: string; color: string; icon: typeof Clock }> = {
@@ -41,8 +41,8 @@ export function ReelCard({ reel }: ReelCardProps) {
         </span>
       </div>
 
-      {reel.script_text && (
-        <p className="mt-3 text-xs text-gray-600 line-clamp-2">{reel.script_text}</p>
+      {reel.script_preview && (
+        <p className="mt-3 text-xs text-gray-600 line-clamp-2">{reel.script_preview}</p>
       )}
 
       {reel.error_message && (
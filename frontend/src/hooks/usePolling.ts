@@ -1,11 +1,17 @@
 import { useState, useEffect, useRef, useCallback } from 'react';
-import type { Reel } from '../types';
+import type { Reel, ReelEvent, ScriptEvent } from '../types';
 import { reelsApi } from '../api/reels';
 
+// Follows a reel's progress via the server-sent events stream, falling back
+// to interval polling if the stream cannot be opened. While the stream is
+// open a slow poll still runs, since events are best-effort.
+const STREAM_BACKUP_POLL_MS = 20000;
+
 export function usePolling(reelId: number | null, intervalMs: number = 3000) {
   const [reel, setReel] = useState<Reel | null>(null);
   const [error, setError] = useState<string | null>(null);
   const intervalRef = useRef<ReturnType<typeof setInterval> | undefined>(undefined);
+  const sourceRef = useRef<EventSource | undefined>(undefined);
   const activeRef = useRef(true);
 
   const isTerminal = (status: string) =>
@@ -16,12 +22,16 @@ export function usePolling(reelId: number | null, intervalMs: number = 3000) {
       clearInterval(intervalRef.current);
       intervalRef.current = undefined;
     }
+    if (sourceRef.current) {
+      sourceRef.current.close();
+      sourceRef.current = undefined;
+    }
   }, []);
 
   const startPolling = useCallback(() => {
     if (!reelId) return;
 
-    // Clear any existing interval first
+    // Clear any existing interval or stream first
     stopPolling();
 
     const fetchReel = async () => {
@@ -37,11 +47,47 @@ export function usePolling(reelId: number | null, intervalMs: number = 3000) {
       }
     };
 
-    fetchReel();
-    intervalRef.current = setInterval(fetchReel, intervalMs);
+    const pollInstead = () => {
+      sourceRef.current?.close();
+      sourceRef.current = undefined;
+      clearInterval(intervalRef.current);
+      intervalRef.current = setInterval(fetchReel, intervalMs);
+    };
+
+    if (typeof EventSource === 'undefined') {
+      fetchReel();
+      pollInstead();
+      return;
+    }
+
+    const source = new EventSource(reelsApi.eventsUrl(reelId));
+    sourceRef.current = source;
+    intervalRef.current = setInterval(fetchReel, Math.max(intervalMs, STREAM_BACKUP_POLL_MS));
+    // Fetch once the stream is open so no transition is missed in between
+    source.onopen = () => fetchReel();
+    source.addEventListener('reel', (e) => {
+      const event: ReelEvent = JSON.parse((e as MessageEvent).data);
+      if (isTerminal(event.status) || event.status === 'script_ready') {
+        // These states carry the final script, paths or duration: load the full reel
+        fetchReel();
+        return;
+      }
+      setReel((prev) => (prev ? { ...prev, ...event, id: event.reel_id } : prev));
+    });
+    // Partial script text while it is being written
+    source.addEventListener('script', (e) => {
+      const event: ScriptEvent = JSON.parse((e as MessageEvent).data);
+      setReel((prev) => (prev ? { ...prev, script_text: event.script_text } : prev));
+    });
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        fetchReel();
+        pollInstead();
+      }
+    };
   }, [reelId, intervalMs, stopPolling]);
 
-  // Start polling on mount / reelId change
+  // Start following on mount / reelId change
   useEffect(() => {
     activeRef.current = true;
     startPolling();
@@ -51,7 +97,7 @@ export function usePolling(reelId: number | null, intervalMs: number = 3000) {
     };
   }, [startPolling, stopPolling]);
 
-  // Restart polling when reel state changes from terminal to non-terminal
+  // Restart when reel state changes from terminal to non-terminal
   // (e.g., user clicks "Generate" on a script_ready or failed reel)
   const restartPolling = useCallback(() => {
     startPolling();
@@ -1,30 +1,39 @@
 import { useState, useEffect, useCallback } from 'react';
-import type { Reel } from '../types';
+import type { ReelSummary } from '../types';
 import { reelsApi } from '../api/reels';
 
 export function useReels() {
-  const [reels, setReels] = useState<Reel[]>([]);
+  const [reels, setReels] = useState<ReelSummary[]>([]);
   const [total, setTotal] = useState(0);
-  const [page, setPage] = useState(1);
+  const [totalCapped, setTotalCapped] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
 
-  const fetchReels = useCallback(async (p: number = page) => {
+  // cursor === null loads the first page (with total); otherwise appends
+  const fetchReels = useCallback(async (cursor: string | null = null) => {
     setLoading(true);
     try {
-      const { data } = await reelsApi.list(p);
-      setReels(data.reels);
-      setTotal(data.total);
-      setPage(data.page);
+      const { data } = await reelsApi.list(cursor);
+      setReels((prev) => (cursor === null ? data.reels : [...prev, ...data.reels]));
+      if (data.total !== null) {
+        setTotal(data.total);
+        setTotalCapped(data.total_capped);
+      }
+      setNextCursor(data.next_cursor);
     } catch {
       // handled by interceptor
     } finally {
       setLoading(false);
     }
-  }, [page]);
+  }, []);
 
   useEffect(() => {
     fetchReels();
   }, [fetchReels]);
 
-  return { reels, total, page, loading, setPage, refetch: fetchReels };
+  const loadMore = useCallback(() => {
+    if (nextCursor) fetchReels(nextCursor);
+  }, [fetchReels, nextCursor]);
+
+  return { reels, total, totalCapped, hasMore: nextCursor !== null, loading, loadMore, refetch: fetchReels };
 }
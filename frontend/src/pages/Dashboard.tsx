@@ -5,16 +5,14 @@ import { ReelCard } from '../components/features/ReelCard';
 import { Button } from '../components/ui/Button';
 
 export function DashboardPage() {
-  const { reels, total, page, loading, setPage } = useReels();
-  const perPage = 10;
-  const totalPages = Math.ceil(total / perPage);
+  const { reels, total, totalCapped, hasMore, loading, loadMore } = useReels();
 
   return (
     <div>
       <div className="flex items-center justify-between mb-6">
         <div>
           <h1 className="text-2xl font-bold text-gray-900">My Reels</h1>
-          <p className="text-sm text-gray-600">{total} total reels</p>
+          <p className="text-sm text-gray-600">{total}{totalCapped ? '+' : ''} total reels</p>
         </div>
         <Link to="/create">
           <Button>
@@ -48,26 +46,10 @@ export function DashboardPage() {
             ))}
           </div>
 
-          {totalPages > 1 && (
-            <div className="flex justify-center gap-2 mt-6">
-              <Button
-                variant="secondary"
-                size="sm"
-                disabled={page <= 1}
-                onClick={() => setPage(page - 1)}
-              >
-                Previous
-              </Button>
-              <span className="flex items-center text-sm text-gray-600">
-                Page {page} of {totalPages}
-              </span>
-              <Button
-                variant="secondary"
-                size="sm"
-                disabled={page >= totalPages}
-                onClick={() => setPage(page + 1)}
-              >
-                Next
+          {hasMore && (
+            <div className="flex justify-center mt-6">
+              <Button variant="secondary" size="sm" disabled={loading} onClick={loadMore}>
+                {loading ? 'Loading...' : 'Load more'}
               </Button>
             </div>
           )}
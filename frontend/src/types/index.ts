@@ -26,10 +26,27 @@ export interface Reel {
   video_final_path: string | null;
   error_message: string | null;
   duration_seconds: number | null;
+  progress_percent: number | null;
+  eta_seconds: number | null;
   created_at: string;
   completed_at: string | null;
 }
 
+export interface ReelEvent {
+  type: 'reel';
+  reel_id: number;
+  status: ReelStatus;
+  progress_percent: number | null;
+  eta_seconds: number | null;
+  error_message: string | null;
+}
+
+export interface ScriptEvent {
+  type: 'script';
+  reel_id: number;
+  script_text: string;
+}
+
 export type ReelStatus =
   | 'pending'
   | 'generating_script'
@@ -40,11 +57,26 @@ export type ReelStatus =
   | 'completed'
   | 'failed';
 
+export interface ReelSummary {
+  id: number;
+  topic: string;
+  language: string;
+  status: ReelStatus;
+  script_preview: string | null;
+  error_message: string | null;
+  duration_seconds: number | null;
+  progress_percent: number | null;
+  created_at: string;
+  completed_at: string | null;
+}
+
 export interface ReelList {
-  reels: Reel[];
-  total: number;
-  page: number;
+  reels: ReelSummary[];
+  total: number | null;
+  total_capped: boolean;
+  page: number | null;
   per_page: number;
+  next_cursor: string | null;
 }
 
 export interface ReelCreate {